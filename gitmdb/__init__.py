@@ -0,0 +1,5 @@
+"""
+gitmdb - movie & TV series catalog tooling for the M3U-Repo api/ tree
+"""
+
+__version__ = '0.1.0'
@@ -0,0 +1,33 @@
+"""
+api/alts/{kind}/{imdb_id}.json mappings from IMDB IDs to slugs
+"""
+
+
+def alt_parts(kind, imdb_id):
+    return ('api', 'alts', kind, f'{imdb_id}.json')
+
+
+def update_alt_mapping(catalog, kind, imdb_id, title, slug):
+    """Add slug to the alternative mapping of imdb_id, creating it if needed; return True if it changed"""
+    parts = alt_parts(kind, imdb_id)
+
+    if catalog.exists(*parts):
+        # Load existing and merge slug if not already present
+        alt_data = catalog.read_json(*parts)
+
+        if 'slug' in alt_data and isinstance(alt_data['slug'], list):
+            if slug in alt_data['slug']:
+                return False
+            alt_data['slug'].append(slug)
+        else:
+            alt_data['slug'] = [slug]
+    else:
+        # Create new alternative mapping
+        alt_data = {
+            'type': kind,
+            'title': title,
+            'slug': [slug]
+        }
+
+    catalog.write_json(alt_data, *parts)
+    return True
@@ -0,0 +1,169 @@
+"""
+Paged browse listings under api/browse/.
+
+    api/browse/{kind}/{order}/index.json      listing summary
+    api/browse/{kind}/{order}/{page}.json     one page of items
+    api/browse/{kind}/category/{category}/... same, per category
+
+Orders are `recent` (recently added first), `az` and `year` (newest first).
+Pages only carry their items and prev/next links, so adding a title rewrites
+the page it lands on and the pages after it; index.json keeps a digest per
+page to find them without reading the earlier pages back.
+"""
+
+import hashlib
+import json
+import os
+import subprocess
+
+from gitmdb.catalog import KINDS
+from gitmdb.generate import DEFAULT_CATEGORIES
+from gitmdb.utils import slugify
+
+PAGE_SIZE = 50
+BROWSE_ROOT = ('api', 'browse')
+
+
+def _title_key(item):
+    return ((item['title'] or item['slug']).casefold(), item['slug'])
+
+
+ORDERS = {
+    'recent': lambda items: sorted(items, key=lambda item: (-item['added'], item['slug'])),
+    'az': lambda items: sorted(items, key=_title_key),
+    'year': lambda items: sorted(items, key=lambda item: (item['year'] is None, -(item['year'] or 0), _title_key(item))),
+}
+
+
+def git_added_times(catalog):
+    """Map (kind, slug) to the commit time of the first about.json of each title, from one git log pass
+    over the history of the catalog's revision (HEAD for the working tree)"""
+    try:
+        output = subprocess.run(
+            ['git', '-C', catalog.root, 'log', '--diff-filter=A', '--no-renames', '--name-only',
+             '--format=%ct', catalog.rev or 'HEAD', '--', *('api/' + kind for kind in KINDS)],
+            capture_output=True, text=True, check=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return {}
+
+    added = {}
+    timestamp = None
+    for line in output.splitlines():
+        if line.isdigit():
+            timestamp = int(line)
+            continue
+        parts = line.split('/')
+        # api/{kind}/[{shard}/]{slug}/about.json; newest commits come first
+        if timestamp and len(parts) in (4, 5) and parts[0] == 'api' and parts[1] in KINDS and parts[-1] == 'about.json':
+            added[(parts[1], parts[-2])] = timestamp
+    return added
+
+
+def collect_items(catalog, kind, added_times):
+    """Browse items of every title of a kind"""
+    items = []
+    for slug in catalog.slugs(kind):
+        title_parts = catalog.title_parts(kind, slug)
+        about_parts = title_parts + ('about.json',)
+        if not catalog.exists(*about_parts):
+            continue
+        try:
+            about_data = catalog.read_json(*about_parts)
+        except json.JSONDecodeError:
+            print(f"Warning: Could not decode JSON from {catalog.path(*about_parts)}")
+            continue
+
+        added = added_times.get((kind, slug))
+        if added is None:
+            # Not committed yet; a catalog read from a commit has no such titles
+            added = int(os.path.getmtime(catalog.path(*about_parts))) if catalog.rev is None else 0
+        items.append({
+            'slug': slug,
+            'path': '/'.join(title_parts),
+            'title': about_data.get('title'),
+            'year': about_data.get('year'),
+            'category': about_data.get('category') or DEFAULT_CATEGORIES[kind],
+            'cover': about_data.get('cover'),
+            'added': added,
+        })
+    return items
+
+
+def _page_path(listing_parts, page):
+    return '/'.join(listing_parts + (f'{page}.json',))
+
+
+def write_listing(catalog, listing_parts, items):
+    """Write the pages of one listing, return the number of files written"""
+    pages = [items[i:i + PAGE_SIZE] for i in range(0, len(items), PAGE_SIZE)] or [[]]
+    index_parts = listing_parts + ('index.json',)
+    previous = {}
+    if catalog.output_exists(*index_parts):
+        try:
+            previous = catalog.read_json(*index_parts)
+        except json.JSONDecodeError:
+            pass
+    previous_digests = previous.get('page_digests', [])
+
+    written = 0
+    digests = []
+    for number, page_items in enumerate(pages, start=1):
+        page = {
+            'page': number,
+            'prev': _page_path(listing_parts, number - 1) if number > 1 else None,
+            'next': _page_path(listing_parts, number + 1) if number < len(pages) else None,
+            'items': page_items,
+        }
+        digest = hashlib.sha1(json.dumps(page, sort_keys=True).encode('utf-8')).hexdigest()
+        digests.append(digest)
+
+        page_parts = listing_parts + (f'{number}.json',)
+        if number <= len(previous_digests) and previous_digests[number - 1] == digest and catalog.output_exists(*page_parts):
+            continue
+        catalog.write_json(page, *page_parts)
+        written += 1
+
+    # Drop pages past the new end of the listing
+    for number in range(len(pages) + 1, len(previous_digests) + 1):
+        stale_parts = listing_parts + (f'{number}.json',)
+        if catalog.exists(*stale_parts):
+            catalog.remove(*stale_parts)
+            written += 1
+
+    index = {
+        'page_size': PAGE_SIZE,
+        'total': len(items),
+        'pages': len(pages),
+        'first': _page_path(listing_parts, 1),
+        'page_digests': digests,
+    }
+    if index != previous:
+        catalog.write_json(index, *index_parts)
+        written += 1
+    return written
+
+
+def build_browse_index(catalog):
+    """Write every browse listing, return the number of files written"""
+    added_times = git_added_times(catalog)
+    written = 0
+    for kind in KINDS:
+        kind_parts = BROWSE_ROOT + (kind,)
+        items = collect_items(catalog, kind, added_times)
+
+        for order, sort_items in ORDERS.items():
+            written += write_listing(catalog, kind_parts + (order,), sort_items(items))
+
+        categories = {}
+        for item in items:
+            categories.setdefault(slugify(item['category']) or 'uncategorized', []).append(item)
+        for category, category_items in categories.items():
+            written += write_listing(catalog, kind_parts + ('category', category), ORDERS['az'](category_items))
+
+        # Remove listings of categories that no longer have titles
+        for category in catalog.subdirs(*kind_parts, 'category'):
+            if category not in categories:
+                catalog.remove_tree(*kind_parts, 'category', category)
+                written += 1
+    return written
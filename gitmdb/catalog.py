@@ -0,0 +1,169 @@
+"""
+Cached access to the api/ tree.
+
+A single Catalog is shared by every step of one CLI invocation, so a chained
+`ingest + generate` only parses each JSON file once and sees its own writes.
+"""
+
+import hashlib
+import os
+import shutil
+
+from gitmdb.utils import read_json, write_json
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MOVIES = 'movies'
+TV_SERIES = 'tv-series'
+KINDS = (MOVIES, TV_SERIES)
+
+STUB_SLUG = 'stub'
+
+# api/{kind}/layout.json selects the folder layout of a kind; without it the
+# layout is flat (api/movies/{slug}). The sharded layout puts every title
+# under the first hex digits of sha1(slug): api/movies/{shard}/{slug}.
+LAYOUT_FILE = 'layout.json'
+FLAT_LAYOUT = {'layout': 'flat'}
+DEFAULT_SHARD_WIDTH = 2
+
+
+def shard_name(slug, width=DEFAULT_SHARD_WIDTH):
+    """Shard folder of a slug in the sharded layout"""
+    return hashlib.sha1(slug.encode('utf-8')).hexdigest()[:width]
+
+
+def is_shard_name(name, width):
+    return len(name) == width and all(c in '0123456789abcdef' for c in name)
+
+
+class Catalog:
+    """Read/write access to api/ with parsed JSON and directory listings cached"""
+
+    # Commit the catalog is read from; None for the working tree
+    rev = None
+
+    def __init__(self, root=None):
+        self.root = os.path.abspath(root or PROJECT_ROOT)
+        self._json = {}
+        self._listings = {}
+        self._memo = {}
+
+    def path(self, *parts):
+        return os.path.join(self.root, *parts)
+
+    def exists(self, *parts):
+        return parts in self._json or os.path.exists(self.path(*parts))
+
+    def isdir(self, *parts):
+        return os.path.isdir(self.path(*parts))
+
+    def _scan(self, parts):
+        if parts not in self._listings:
+            try:
+                with os.scandir(self.path(*parts)) as it:
+                    entries = [(entry.name, entry.is_dir()) for entry in it]
+            except (FileNotFoundError, NotADirectoryError):
+                entries = []
+            self._listings[parts] = sorted(entries)
+        return self._listings[parts]
+
+    def listdir(self, *parts):
+        """Sorted entry names of a directory, empty if it does not exist"""
+        return [name for name, _ in self._scan(parts)]
+
+    def subdirs(self, *parts):
+        """Sorted sub-directory names of a directory"""
+        return [name for name, is_dir in self._scan(parts) if is_dir]
+
+    def read_json(self, *parts):
+        """Parsed JSON content of a file; decode errors are not cached"""
+        if parts not in self._json:
+            self._json[parts] = read_json(self.path(*parts))
+        return self._json[parts]
+
+    def write_json(self, data, *parts):
+        """Write a JSON file, creating parent folders, and keep the cache in sync"""
+        os.makedirs(self.path(*parts[:-1]), exist_ok=True)
+        write_json(self.path(*parts), data)
+        self._json[parts] = data
+        self._forget_listings(parts)
+
+    def makedirs(self, *parts):
+        os.makedirs(self.path(*parts), exist_ok=True)
+        self._forget_listings(parts)
+
+    def open_output(self, *parts, binary=False):
+        """Open a file for writing other than JSON (playlists, snapshot), creating parent folders"""
+        os.makedirs(self.path(*parts[:-1]), exist_ok=True)
+        self.invalidate(*parts)
+        if binary:
+            return open(self.path(*parts), 'wb')
+        return open(self.path(*parts), 'w', encoding='utf-8')
+
+    def remove(self, *parts):
+        os.remove(self.path(*parts))
+        self.invalidate(*parts)
+
+    def remove_tree(self, *parts):
+        shutil.rmtree(self.path(*parts))
+        self.invalidate(*parts)
+
+    def output_exists(self, *parts):
+        """Whether a generated file from an earlier run is present where this run writes
+
+        Incremental indexes only keep such files as they are when this is true.
+        """
+        return self.exists(*parts)
+
+    def invalidate(self, *parts):
+        """Forget cached JSON and listings under parts, after it changed outside the catalog"""
+        size = len(parts)
+        for cache in (self._json, self._listings):
+            for key in [key for key in cache if key[:size] == parts]:
+                del cache[key]
+        self._forget_listings(parts)
+
+    def _forget_listings(self, parts):
+        for i in range(len(parts)):
+            self._listings.pop(parts[:i], None)
+
+    def clear_cache(self):
+        """Drop cached JSON and listings, e.g. between batches of a bulk import; memos are kept"""
+        self._json.clear()
+        self._listings.clear()
+
+    def close(self):
+        """Release resources held by the catalog"""
+
+    def memo(self, key, factory):
+        """Derived structure (e.g. a title index) built once per catalog by factory()"""
+        if key not in self._memo:
+            self._memo[key] = factory()
+        return self._memo[key]
+
+    def layout(self, kind):
+        """Folder layout settings of a kind"""
+        parts = ('api', kind, LAYOUT_FILE)
+        if self.exists(*parts):
+            return self.read_json(*parts)
+        return FLAT_LAYOUT
+
+    def title_parts(self, kind, slug):
+        """Path parts of a movie or series folder"""
+        layout = self.layout(kind)
+        if layout.get('layout') == 'sharded' and slug != STUB_SLUG:
+            return ('api', kind, shard_name(slug, layout.get('width', DEFAULT_SHARD_WIDTH)), slug)
+        return ('api', kind, slug)
+
+    def slugs(self, kind):
+        """Sorted slugs of a kind, without the stub template"""
+        layout = self.layout(kind)
+        if layout.get('layout') != 'sharded':
+            return [name for name in self.subdirs('api', kind) if name != STUB_SLUG]
+
+        width = layout.get('width', DEFAULT_SHARD_WIDTH)
+        slugs = []
+        for shard in self.subdirs('api', kind):
+            if is_shard_name(shard, width):
+                slugs.extend(self.subdirs('api', kind, shard))
+        return sorted(slugs)
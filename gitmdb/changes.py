@@ -0,0 +1,72 @@
+"""
+Change sets: the titles and episodes written by one run, so `generate --changed`
+only re-renders those playlist sections.
+
+    {"movies": {"slug": null}, "tv-series": {"slug": [["1", "2"], ...]}}
+
+null stands for the whole title (new title, about.json edit); a list holds
+the (season, episode) folders that changed. A kind mapped to null instead of
+an object changed as a whole (bulk import), so its playlists are regenerated.
+"""
+
+import json
+
+from gitmdb.catalog import KINDS
+
+CHANGES_MEMO = 'changes'
+
+
+def empty_changes():
+    return {kind: {} for kind in KINDS}
+
+
+def change_set(catalog):
+    """Change set collected by the writes of this process"""
+    return catalog.memo(CHANGES_MEMO, empty_changes)
+
+
+def record_change(catalog, kind, slug, season=None, episode=None):
+    """Mark a title, or one episode of it, as changed"""
+    titles = change_set(catalog)[kind]
+    if titles is None:
+        return
+    if season is None:
+        titles[slug] = None
+    elif titles.get(slug, ()) is not None:
+        titles.setdefault(slug, set()).add((str(season), str(episode)))
+
+
+def record_kind_change(catalog, kind):
+    """Mark every title of a kind as changed, dropping the per-title entries"""
+    change_set(catalog)[kind] = None
+
+
+def is_changed(changes, kind, slug, season=None, episode=None):
+    titles = changes.get(kind, {})
+    if titles is None:
+        return True
+    if slug not in titles:
+        return False
+    return titles[slug] is None or (str(season), str(episode)) in titles[slug]
+
+
+def save_changes(changes, path):
+    data = {kind: None if titles is None else
+            {slug: None if episodes is None else sorted(list(key) for key in episodes)
+             for slug, episodes in sorted(titles.items())}
+            for kind, titles in changes.items()}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=4, ensure_ascii=False)
+
+
+def load_changes(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    changes = empty_changes()
+    for kind in KINDS:
+        if kind in data and data[kind] is None:
+            changes[kind] = None
+            continue
+        for slug, episodes in data.get(kind, {}).items():
+            changes[kind][slug] = None if episodes is None else {(str(season), str(episode)) for season, episode in episodes}
+    return changes
@@ -0,0 +1,106 @@
+"""
+Single entry point for the repository tooling.
+
+    python -m gitmdb [--root PATH] [--rev REV --out PATH] <command> [args...] [+ <command> [args...]]...
+
+Steps separated by `+` run in order in the same process and share one Catalog.
+Command modules are only imported when their step runs. With --rev the
+catalog is read from that commit in the git object store instead of the
+working tree, and generated files are written under --out.
+"""
+
+import argparse
+import importlib
+import sys
+
+STEP_SEPARATOR = '+'
+
+COMMANDS = {
+    'ingest': ('gitmdb.ingest', 'process an add-movie / add-tv-series issue'),
+    'generate': ('gitmdb.generate', 'write movies.m3u / tv-series.m3u'),
+    'validate': ('gitmdb.validate', 'check the api/ folder structure'),
+    'check-integrity': ('gitmdb.integrity', 'cross-check alts, IMDB IDs and season/episode folders'),
+    'build-indexes': ('gitmdb.indexes', 'rebuild derived index files'),
+    'import-m3u': ('gitmdb.m3u_import', 'bulk import an external M3U playlist'),
+    'rank-mirrors': ('gitmdb.mirrors', 'measure mirror speed to order playlist URLs'),
+    'subtitles': ('gitmdb.subtitles', 'ingest, query and export subtitle cue stores'),
+    'search': ('gitmdb.subtitle_search', 'find a phrase in the indexed subtitles'),
+    'watch': ('gitmdb.watch', 'regenerate the playlists whenever api/ changes'),
+    'serve': ('gitmdb.standin', 'serve the checkout like raw.githubusercontent.com for client testing'),
+    'migrate-layout': ('gitmdb.layout', 'switch api/ between the flat and sharded layout'),
+}
+
+
+def split_steps(argv):
+    """Split argv into command steps on the `+` separator"""
+    steps = [[]]
+    for arg in argv:
+        if arg == STEP_SEPARATOR:
+            steps.append([])
+        else:
+            steps[-1].append(arg)
+    return [step for step in steps if step]
+
+
+def build_parser():
+    commands_help = '\n'.join(f'  {name:<15}{help_text}' for name, (_, help_text) in COMMANDS.items())
+    parser = argparse.ArgumentParser(
+        prog='gitmdb',
+        usage='%(prog)s [--root PATH] [--rev REV --out PATH] <command> [args...] [+ <command> [args...]]...',
+        description=f'commands:\n{commands_help}',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument('--root', help='repository root (default: the checkout containing this package)')
+    parser.add_argument('--rev', help='read the catalog from this commit, branch or tag instead of the working tree')
+    parser.add_argument('--out', help='with --rev, folder for generated files (required, so the working tree is never written)')
+    parser.add_argument('steps', nargs=argparse.REMAINDER)
+    return parser
+
+
+def run_step(step, catalog):
+    name, step_args = step[0], step[1:]
+    if name not in COMMANDS:
+        print(f"Error: unknown command '{name}' (expected one of: {', '.join(COMMANDS)})")
+        return 2
+
+    module = importlib.import_module(COMMANDS[name][0])
+    parser = argparse.ArgumentParser(prog=f'gitmdb {name}', description=COMMANDS[name][1])
+    module.add_arguments(parser)
+    return module.run(parser.parse_args(step_args), catalog)
+
+
+def main(argv=None):
+    args = build_parser().parse_args(sys.argv[1:] if argv is None else argv)
+    steps = split_steps(args.steps)
+    if not steps:
+        build_parser().print_help()
+        return 2
+
+    if args.out and not args.rev:
+        print("Error: --out is only used with --rev")
+        return 2
+    if args.rev:
+        from gitmdb.git_catalog import GitCatalog
+
+        if not args.out:
+            print("Error: --rev needs --out, the folder generated files are written to")
+            return 2
+
+        try:
+            catalog = GitCatalog(args.root, args.rev, args.out)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return 2
+    else:
+        from gitmdb.catalog import Catalog
+
+        catalog = Catalog(args.root)
+
+    try:
+        for step in steps:
+            status = run_step(step, catalog)
+            if status:
+                return status
+    finally:
+        catalog.close()
+    return 0
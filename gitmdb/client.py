@@ -0,0 +1,225 @@
+"""
+HTTP client for a published gitmdb catalog.
+
+    client = GitmdbClient()
+    client.movie('kung-fu-rookie-es-dub')
+    client.resolve_imdb('tt12637874')          # -> ('tv-series', ['fallout'])
+    client.series_episodes('fallout')          # every episode's urls.json, one tree listing
+
+Files are read from raw.githubusercontent.com (or any server with the same
+layout) and kept in an on-disk cache. A cached file younger than max_age is
+used as is; an older one is revalidated with If-None-Match /
+If-Modified-Since, so an unchanged file costs a 304 and no body. Concurrent
+requests for the same URL share one fetch. Folder listings come from the
+GitHub git trees API, so a whole series is listed in one call.
+
+`gitmdb serve` runs a local stand-in for both endpoints over a checkout.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from gitmdb.catalog import DEFAULT_SHARD_WIDTH, KINDS, MOVIES, TV_SERIES, shard_name
+
+DEFAULT_REPO = 'cacing69/m3u-repo'
+DEFAULT_REF = 'main'
+GITHUB_API_URL = 'https://api.github.com'
+RAW_URL = 'https://raw.githubusercontent.com'
+
+DEFAULT_MAX_AGE = 300
+DEFAULT_TIMEOUT = 30
+DEFAULT_CONCURRENCY = 8
+
+
+def default_cache_dir():
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'gitmdb')
+
+
+class GitmdbClient:
+    """Cached, coalescing reader of the api/ tree of a gitmdb repository"""
+
+    def __init__(self, repo=DEFAULT_REPO, ref=DEFAULT_REF, raw_url=None, api_url=GITHUB_API_URL,
+                 cache_dir=None, token=None, max_age=DEFAULT_MAX_AGE, timeout=DEFAULT_TIMEOUT,
+                 concurrency=DEFAULT_CONCURRENCY):
+        self.repo = repo
+        self.ref = ref
+        self.raw_url = (raw_url or f'{RAW_URL}/{repo}/{ref}').rstrip('/')
+        self.api_url = api_url.rstrip('/')
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.token = token if token is not None else os.environ.get('GITHUB_TOKEN')
+        self.max_age = max_age
+        self.timeout = timeout
+        self.concurrency = concurrency
+        self.requests = 0
+        self._entries = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    # Transport
+
+    def _cache_path(self, url):
+        return os.path.join(self.cache_dir, hashlib.sha1(url.encode('utf-8')).hexdigest() + '.json')
+
+    def _load_entry(self, url):
+        entry = self._entries.get(url)
+        if entry is None:
+            try:
+                with open(self._cache_path(url), 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                return None
+            self._entries[url] = entry
+        return entry
+
+    def _store_entry(self, url, entry):
+        self._entries[url] = entry
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._cache_path(url)
+        temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+    def _fetch(self, url, api):
+        entry = self._load_entry(url)
+        if entry and time.time() - entry['fetched_at'] < self.max_age:
+            return entry['data']
+
+        headers = {'User-Agent': 'gitmdb-client'}
+        if api:
+            headers['Accept'] = 'application/vnd.github+json'
+            if self.token:
+                headers['Authorization'] = f'token {self.token}'
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        self.requests += 1
+        try:
+            with urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=self.timeout) as response:
+                data = json.loads(response.read().decode('utf-8'))
+                response_headers = response.headers
+        except urllib.error.HTTPError as e:
+            if e.code == 304 and entry:
+                entry = dict(entry, fetched_at=time.time())
+                self._store_entry(url, entry)
+                return entry['data']
+            if e.code != 404:
+                raise
+            # Missing files are cached too, e.g. the layout.json of a flat kind
+            data, response_headers = None, {}
+
+        self._store_entry(url, {
+            'url': url,
+            'etag': response_headers.get('ETag'),
+            'last_modified': response_headers.get('Last-Modified'),
+            'fetched_at': time.time(),
+            'data': data,
+        })
+        return data
+
+    def _get(self, url, api=False):
+        """Parsed JSON at url (None if it does not exist); concurrent calls for one URL share a fetch"""
+        with self._lock:
+            future = self._inflight.get(url)
+            owner = future is None
+            if owner:
+                future = self._inflight[url] = Future()
+        if not owner:
+            return future.result()
+
+        try:
+            data = self._fetch(url, api)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[url]
+        future.set_result(data)
+        return data
+
+    def get_json(self, path):
+        """Parsed JSON of a repository file, None if it does not exist"""
+        return self._get(f'{self.raw_url}/{urllib.parse.quote(path)}')
+
+    def get_many(self, paths):
+        """get_json of several paths with up to `concurrency` requests in flight, in order"""
+        with ThreadPoolExecutor(max_workers=max(self.concurrency, 1)) as executor:
+            return list(executor.map(self.get_json, paths))
+
+    def tree(self, path):
+        """Paths of every file under a repository folder, relative to it, from one git trees call"""
+        tree_ref = urllib.parse.quote(f'{self.ref}:{path}', safe='/:')
+        listing = self._get(f'{self.api_url}/repos/{self.repo}/git/trees/{tree_ref}?recursive=1', api=True)
+        if listing is None:
+            return []
+        if listing.get('truncated'):
+            raise RuntimeError(f"Tree listing of {path} was truncated by the server")
+        return [item['path'] for item in listing.get('tree', []) if item.get('type') == 'blob']
+
+    # Catalog
+
+    def layout(self, kind):
+        return self.get_json(f'api/{kind}/layout.json') or {'layout': 'flat'}
+
+    def title_path(self, kind, slug):
+        """Folder of a movie or series, following the sharded layout when it is used"""
+        layout = self.layout(kind)
+        if layout.get('layout') == 'sharded':
+            return f"api/{kind}/{shard_name(slug, layout.get('width', DEFAULT_SHARD_WIDTH))}/{slug}"
+        return f'api/{kind}/{slug}'
+
+    def resolve_imdb(self, imdb_id, kind=None):
+        """(kind, slugs) of an IMDB ID from api/alts, None if it is not mapped"""
+        for candidate in (kind,) if kind else KINDS:
+            alt_data = self.get_json(f'api/alts/{candidate}/{imdb_id}.json')
+            if alt_data and alt_data.get('slug'):
+                return candidate, alt_data['slug']
+        return None
+
+    def movie(self, slug):
+        return self.get_json(f'{self.title_path(MOVIES, slug)}/about.json')
+
+    def movie_urls(self, slug):
+        return self.get_json(f'{self.title_path(MOVIES, slug)}/urls.json')
+
+    def series(self, slug):
+        return self.get_json(f'{self.title_path(TV_SERIES, slug)}/about.json')
+
+    def episode_urls(self, slug, season, episode):
+        return self.get_json(f'{self.title_path(TV_SERIES, slug)}/s/{season}/e/{episode}/urls.json')
+
+    def subtitles(self, kind, slug, lang, season=None, episode=None):
+        """Subtitle index.json of a movie or an episode"""
+        path = self.title_path(kind, slug)
+        if kind == TV_SERIES:
+            path += f'/s/{season}/e/{episode}'
+        return self.get_json(f'{path}/subtitles/{lang}/index.json')
+
+    def seasons(self, slug):
+        """{season: [episode, ...]} of a series, sorted, from one tree listing"""
+        seasons = {}
+        for path in self.tree(self.title_path(TV_SERIES, slug)):
+            parts = path.split('/')
+            if len(parts) == 5 and parts[0] == 's' and parts[2] == 'e' and parts[4] == 'urls.json':
+                if parts[1].isdigit() and parts[3].isdigit():
+                    seasons.setdefault(int(parts[1]), []).append(int(parts[3]))
+        return {season: sorted(episodes) for season, episodes in sorted(seasons.items())}
+
+    def series_episodes(self, slug):
+        """{(season, episode): urls.json} of a whole series: one tree listing plus batched file fetches"""
+        coordinates = [(season, episode) for season, episodes in self.seasons(slug).items() for episode in episodes]
+        base = self.title_path(TV_SERIES, slug)
+        urls = self.get_many([f'{base}/s/{season}/e/{episode}/urls.json' for season, episode in coordinates])
+        return dict(zip(coordinates, urls))
@@ -0,0 +1,136 @@
+"""
+Near-duplicate title detection.
+
+Titles and slugs are reduced to a normalized key (no dub/language suffix, no
+year) and indexed by character trigrams. A lookup only scores the titles that
+share at least one trigram with the query, so it does not scan the catalog.
+Since the key drops dub markers, a match is only merged automatically when
+both titles are dubs in the same languages (or neither is a dub).
+"""
+
+import json
+import re
+from collections import Counter
+
+from gitmdb.utils import dub_codes, slugify
+
+MERGE_THRESHOLD = 0.8
+FLAG_THRESHOLD = 0.5
+
+DUPLICATE_POLICIES = ('merge', 'flag', 'off')
+
+IGNORED_TOKENS = {
+    'dub', 'dubbed', 'sub', 'subbed', 'latino', 'castellano', 'espanol', 'español',
+    'es', 'en', 'id', 'ko', 'ja', 'hd', 'fhd', '1080p', '720p', '480p',
+}
+YEAR_RE = re.compile(r'^(19|20)\d{2}$')
+
+
+def normalize_title(text):
+    """Reduce a title or slug to the key used for duplicate detection"""
+    tokens = slugify(text or '').split('-')
+    return ' '.join(token for token in tokens if token and token not in IGNORED_TOKENS and not YEAR_RE.match(token))
+
+
+def trigrams(key):
+    padded = f'  {key} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TitleIndex:
+    """Trigram inverted index over the titles and slugs of one kind"""
+
+    def __init__(self):
+        self.postings = {}
+        self.keys = {}
+        self.years = {}
+        self.dubs = {}
+
+    def add(self, slug, title=None, year=None):
+        """Index a slug under its own name and its title"""
+        if year:
+            self.years[slug] = year
+        self.dubs[slug] = self.dubs.get(slug, set()) | dub_codes(slug, title)
+        for text in (slug, title):
+            key = normalize_title(text)
+            if not key or (slug, key) in self.keys:
+                continue
+            grams = trigrams(key)
+            self.keys[(slug, key)] = len(grams)
+            for gram in grams:
+                self.postings.setdefault(gram, set()).add((slug, key))
+
+    def find(self, title, year=None, threshold=FLAG_THRESHOLD):
+        """Return [(score, slug)] of likely duplicates, best first"""
+        key = normalize_title(title)
+        if not key:
+            return []
+        grams = trigrams(key)
+
+        shared = Counter()
+        for gram in grams:
+            shared.update(self.postings.get(gram, ()))
+
+        best = {}
+        for (slug, doc_key), count in shared.items():
+            # Same title in different years is a remake, not a duplicate
+            if year and self.years.get(slug) and self.years[slug] != year:
+                continue
+            score = count / (len(grams) + self.keys[(slug, doc_key)] - count)
+            if score >= threshold and score > best.get(slug, 0):
+                best[slug] = score
+        return sorted(((score, slug) for slug, score in best.items()), reverse=True)
+
+
+def build_title_index(catalog, kind):
+    """Index every title of a kind, including the titles recorded in api/alts"""
+    index = TitleIndex()
+    for slug in catalog.slugs(kind):
+        about_parts = catalog.title_parts(kind, slug) + ('about.json',)
+        about_data = {}
+        if catalog.exists(*about_parts):
+            try:
+                about_data = catalog.read_json(*about_parts)
+            except json.JSONDecodeError:
+                pass
+        index.add(slug, about_data.get('title'), about_data.get('year'))
+
+    existing = set(catalog.slugs(kind))
+    for alt_file in catalog.listdir('api', 'alts', kind):
+        if not alt_file.endswith('.json'):
+            continue
+        try:
+            alt_data = catalog.read_json('api', 'alts', kind, alt_file)
+        except json.JSONDecodeError:
+            continue
+        for slug in alt_data.get('slug') or []:
+            if slug in existing:
+                index.add(slug, alt_data.get('title'))
+    return index
+
+
+def title_index(catalog, kind):
+    """The title index of a kind, built once per catalog and updated as titles are added"""
+    return catalog.memo(('title-index', kind), lambda: build_title_index(catalog, kind))
+
+
+def resolve_slug(catalog, kind, slug, title, year=None, policy='merge'):
+    """Return the slug to write to, merging into a near-duplicate title when policy allows"""
+    index = title_index(catalog, kind)
+    if policy == 'off' or catalog.exists(*catalog.title_parts(kind, slug)):
+        index.add(slug, title, year)
+        return slug
+
+    matches = index.find(title, year)
+    if matches:
+        # A dub and the original (or dubs in other languages) are separate titles
+        dubs = dub_codes(slug, title)
+        for score, existing_slug in matches:
+            if policy == 'merge' and score >= MERGE_THRESHOLD and index.dubs.get(existing_slug, set()) == dubs:
+                print(f"Merging '{title}' into existing {kind} '{existing_slug}' (similarity {score:.2f})")
+                return existing_slug
+        candidates = ', '.join(f'{match_slug} ({match_score:.2f})' for match_score, match_slug in matches[:5])
+        print(f"Warning: '{title}' may duplicate existing {kind}: {candidates}")
+
+    index.add(slug, title, year)
+    return slug
@@ -0,0 +1,533 @@
+"""
+Render movies.m3u, tv-series.m3u and the filtered playlists of playlists.json
+from the api/ tree.
+
+playlists.json declares extra playlists as filters over the same entries:
+
+    {"playlists": [
+        {"output": "playlists/es-dub.m3u", "dub": "es"},
+        {"output": "playlists/id-subtitles.m3u", "kinds": ["tv-series"], "subtitles": "id"}
+    ]}
+
+Every filter must match (a list value matches any of its items). The api/
+tree is walked once; each entry is rendered once and written to every
+playlist that accepts it.
+
+api/playlist-sections.json records the entry keys and lengths of every
+playlist written. `generate --changed` uses it to splice freshly rendered
+entries of the titles in a change set into the existing files, without
+walking the rest of api/.
+"""
+
+import hashlib
+import io
+import json
+import os
+
+from gitmdb.catalog import KINDS, MOVIES, TV_SERIES
+from gitmdb.changes import change_set, is_changed, load_changes
+from gitmdb.mirrors import load_mirror_results, rank_urls
+from gitmdb.utils import collect_urls, dub_codes, generate_m3u_entry, numeric_sort_key
+
+M3U_HEADER = ['#EXTM3U', '# This file is auto-generated. It will be updated after a PR merge or a push to the main branch.']
+
+OUTPUT_FILES = {
+    MOVIES: 'movies.m3u',
+    TV_SERIES: 'tv-series.m3u',
+}
+
+KIND_CHOICES = list(OUTPUT_FILES)
+
+PLAYLISTS_FILE = 'playlists.json'
+SECTIONS_PARTS = ('api', 'playlist-sections.json')
+
+DEFAULT_CATEGORIES = {
+    MOVIES: 'Movies',
+    TV_SERIES: 'TV Series',
+}
+
+
+def iter_movie_entries(catalog, slugs=None, episodes=None):
+    """Yield one playlist entry per movie, in playlist order; slugs limits it to some movies"""
+    for movie_folder in catalog.slugs(MOVIES) if slugs is None else slugs:
+        movie_parts = catalog.title_parts(MOVIES, movie_folder)
+        about_parts = movie_parts + ('about.json',)
+        urls_parts = movie_parts + ('urls.json',)
+
+        if not (catalog.exists(*about_parts) and catalog.exists(*urls_parts)):
+            continue
+
+        try:
+            about_data = catalog.read_json(*about_parts)
+            urls_data = catalog.read_json(*urls_parts)
+
+            title = about_data.get('title', movie_folder)
+            year = about_data.get('year')
+            if year:
+                title = f"{title} ({year})"
+
+            movie_urls = collect_urls(urls_data)
+            if movie_urls:
+                yield {
+                    'slug': movie_folder,
+                    'title': title,
+                    'group': about_data.get('category', 'Movies'),
+                    'logo': about_data.get('cover') or '',
+                    'urls': movie_urls,
+                    'sources': urls_data,
+                    'about': about_data,
+                }
+
+        except (json.JSONDecodeError, IndexError) as e:
+            print(f"Warning: Could not process {movie_folder}. Error: {e}")
+            continue
+
+
+def iter_tv_series_entries(catalog, slugs=None, episodes=None):
+    """Yield one playlist entry per episode, in playlist order
+
+    slugs limits it to some series, and episodes ({slug: {(season, episode)}})
+    to some episodes of them.
+    """
+    for series_folder in catalog.slugs(TV_SERIES) if slugs is None else slugs:
+        series_parts = catalog.title_parts(TV_SERIES, series_folder)
+        series_about_parts = series_parts + ('about.json',)
+
+        if not catalog.exists(*series_about_parts):
+            continue
+
+        # Parent series metadata (defaults)
+        try:
+            about_data = catalog.read_json(*series_about_parts)
+        except json.JSONDecodeError:
+            print(f"Warning: Could not decode JSON from {catalog.path(*series_about_parts)}")
+            continue
+        parent_clean_title = about_data.get('title', series_folder)
+        parent_title_with_year = parent_clean_title
+        year = about_data.get('year')
+        if year:
+            parent_title_with_year = f"{parent_clean_title} ({year})"
+        parent_cover_url = about_data.get('cover') or ''
+
+        seasons_parts = series_parts + ('s',)
+        for season_folder in sorted(catalog.subdirs(*seasons_parts), key=numeric_sort_key):
+            season_parts = seasons_parts + (season_folder,)
+            season_number = season_folder
+            group_title_for_season = f"{parent_clean_title} Temporada {season_number}"
+
+            # Season-specific metadata (overrides)
+            season_cover_url = parent_cover_url
+            season_about_parts = season_parts + ('about.json',)
+            if catalog.exists(*season_about_parts):
+                try:
+                    season_about_data = catalog.read_json(*season_about_parts)
+
+                    # Use season-specific title for group-title if it exists
+                    season_specific_title = season_about_data.get('title')
+                    if season_specific_title:
+                        group_title_for_season = season_specific_title
+
+                    # Override cover for the season if present
+                    season_cover_url = season_about_data.get('cover') or parent_cover_url
+                except json.JSONDecodeError:
+                    print(f"Warning: Could not decode JSON from {catalog.path(*season_about_parts)}")
+
+            episodes_parts = season_parts + ('e',)
+            for episode_folder in sorted(catalog.subdirs(*episodes_parts), key=numeric_sort_key):
+                if episodes and series_folder in episodes and (season_folder, episode_folder) not in episodes[series_folder]:
+                    continue
+                episode_parts = episodes_parts + (episode_folder,)
+                episode_number = episode_folder
+
+                # Determine display name
+                display_name = f"{parent_clean_title} Temporada {season_number} - S{season_number}E{episode_number}"
+                info_parts = episode_parts + ('info.json',)
+                if catalog.exists(*info_parts):
+                    try:
+                        episode_title = catalog.read_json(*info_parts).get('title')
+                        if episode_title:
+                            display_name = f"{display_name} - {episode_title}"
+                    except json.JSONDecodeError:
+                        print(f"Warning: Could not decode JSON from {catalog.path(*info_parts)}")
+
+                # Get URLs
+                urls_parts = episode_parts + ('urls.json',)
+                if not catalog.exists(*urls_parts):
+                    continue
+                episode_urls = []
+                urls_data = []
+                try:
+                    urls_data = catalog.read_json(*urls_parts)
+                    episode_urls = collect_urls(urls_data)
+                except (json.JSONDecodeError, IndexError) as e:
+                    print(f"Warning: Could not process {catalog.path(*urls_parts)}. Error: {e}")
+
+                if episode_urls:
+                    yield {
+                        'slug': series_folder,
+                        'season': season_number,
+                        'episode': episode_number,
+                        'title': display_name,
+                        'group': group_title_for_season,
+                        'logo': season_cover_url,
+                        'urls': episode_urls,
+                        'sources': urls_data,
+                        'about': about_data,
+                    }
+
+
+ENTRY_ITERATORS = {
+    MOVIES: iter_movie_entries,
+    TV_SERIES: iter_tv_series_entries,
+}
+
+
+def render_entry(entry, mirror_results=None):
+    """Render one playlist entry, mirrors fastest-first when measurements are given"""
+    urls = rank_urls(entry['urls'], mirror_results)
+    return generate_m3u_entry(entry['title'], entry['group'], urls, logo_url=entry['logo'])
+
+
+def render_m3u(entries, mirror_results=None):
+    """Render playlist entries into M3U text"""
+    return join_m3u(render_entry(entry, mirror_results) for entry in entries)
+
+
+def join_m3u(rendered_entries):
+    """M3U text from already rendered entries"""
+    return '\n'.join(M3U_HEADER + list(rendered_entries))
+
+
+def _dub_codes(catalog, kind, entry):
+    """Languages a title is dubbed in, from its slug or title"""
+    return dub_codes(entry['slug'], entry['about'].get('title'))
+
+
+def _languages(catalog, kind, entry):
+    """Audio languages of an entry: about.json `language`, urls.json `language` and dubs"""
+    languages = _dub_codes(catalog, kind, entry)
+    about_language = entry['about'].get('language')
+    if about_language:
+        languages.add(about_language)
+    languages.update(item['language'] for item in entry.get('sources', ())
+                     if isinstance(item, dict) and item.get('language'))
+    return languages
+
+
+def _subtitle_languages(catalog, kind, entry):
+    """Languages with at least one subtitle URL for a movie or an episode"""
+    parts = catalog.title_parts(kind, entry['slug'])
+    if kind == TV_SERIES:
+        parts += ('s', entry['season'], 'e', entry['episode'])
+    parts += ('subtitles',)
+
+    languages = set()
+    for lang in catalog.subdirs(*parts):
+        if not catalog.exists(*parts, lang, 'index.json'):
+            continue
+        try:
+            subtitles = catalog.read_json(*parts, lang, 'index.json')
+        except json.JSONDecodeError:
+            continue
+        if any(isinstance(item, dict) and item.get('url') for item in subtitles or ()):
+            languages.add(lang)
+    return languages
+
+
+def _categories(catalog, kind, entry):
+    return {(entry['about'].get('category') or DEFAULT_CATEGORIES[kind]).casefold()}
+
+
+# filter name -> function returning the values of an entry the filter is matched against
+PLAYLIST_FILTERS = {
+    'category': _categories,
+    'dub': _dub_codes,
+    'language': _languages,
+    'subtitles': _subtitle_languages,
+}
+
+
+class PlaylistWriter:
+    """One output playlist, streamed to disk as entries are accepted"""
+
+    def __init__(self, output, kinds, filters=None):
+        self.output = output
+        self.kinds = tuple(kinds)
+        self.filters = filters or {}
+        self.count = 0
+        self.sections = []
+        self._file = None
+        self._digest = hashlib.sha1()
+
+    @classmethod
+    def from_spec(cls, spec):
+        """Writer of a playlists.json entry, raise ValueError if it is malformed"""
+        if not isinstance(spec, dict) or not spec.get('output'):
+            raise ValueError(f"Playlist needs an 'output' path: {spec}")
+        kinds = spec.get('kinds') or KINDS
+        unknown = [kind for kind in kinds if kind not in KINDS]
+        if unknown:
+            raise ValueError(f"Unknown kind {', '.join(unknown)} in playlist {spec['output']}")
+
+        filters = {}
+        for name, value in spec.items():
+            if name in ('output', 'kinds'):
+                continue
+            if name not in PLAYLIST_FILTERS:
+                raise ValueError(f"Unknown filter '{name}' in playlist {spec['output']} "
+                                 f"(expected one of: {', '.join(PLAYLIST_FILTERS)})")
+            values = value if isinstance(value, list) else [value]
+            filters[name] = {str(item).casefold() for item in values}
+        return cls(spec['output'], kinds, filters)
+
+    def accepts(self, catalog, kind, entry):
+        if kind not in self.kinds:
+            return False
+        for name, wanted in self.filters.items():
+            if not wanted & {value.casefold() for value in PLAYLIST_FILTERS[name](catalog, kind, entry)}:
+                return False
+        return True
+
+    def open(self, catalog, in_memory=False):
+        """Start the playlist; in_memory keeps it in self.content instead of writing the file"""
+        if in_memory:
+            self._file = io.StringIO()
+        else:
+            self._file = catalog.open_output(*self.output.split('/'))
+        self.count = 0
+        self.sections = []
+        self._digest = hashlib.sha1()
+        # Same text as join_m3u: header lines, then '\n' + entry for every entry
+        self._write('\n'.join(M3U_HEADER))
+
+    def _write(self, text):
+        self._file.write(text)
+        self._digest.update(text.encode('utf-8'))
+
+    def write(self, rendered_entry, key):
+        """Append a rendered entry; key ([kind, slug, season, episode]) is recorded for splicing"""
+        self._write('\n')
+        self._write(rendered_entry)
+        self.sections.append(key + [len(rendered_entry)])
+        self.count += 1
+
+    def close(self):
+        if self._file:
+            if isinstance(self._file, io.StringIO):
+                self.content = self._file.getvalue()
+            self._file.close()
+            self._file = None
+        return {'digest': self._digest.hexdigest(), 'sections': self.sections}
+
+
+def entry_key(kind, entry):
+    return [kind, entry['slug'], entry.get('season'), entry.get('episode')]
+
+
+def section_sort_key(section):
+    """Playlist order of an entry key: kind, slug, then numeric season and episode"""
+    kind, slug, season, episode = section[:4]
+    return KINDS.index(kind), slug, numeric_sort_key(season or ''), numeric_sort_key(episode or '')
+
+
+def load_sections(catalog):
+    if catalog.exists(*SECTIONS_PARTS):
+        try:
+            return catalog.read_json(*SECTIONS_PARTS)
+        except json.JSONDecodeError:
+            print(f"Warning: Could not decode JSON from {catalog.path(*SECTIONS_PARTS)}")
+    return {}
+
+
+def save_sections(catalog, records):
+    """Store the section records of the given playlists, keeping those of the others"""
+    sections = dict(load_sections(catalog))
+    sections.update(records)
+    catalog.write_json(dict(sorted(sections.items())), *SECTIONS_PARTS)
+
+
+def load_playlist_writers(catalog, path=None):
+    """Writers of the playlists declared in playlists.json, none if it does not exist"""
+    if path:
+        with open(path, 'r', encoding='utf-8') as f:
+            specs = json.load(f).get('playlists', [])
+    elif catalog.exists(PLAYLISTS_FILE):
+        specs = catalog.read_json(PLAYLISTS_FILE).get('playlists', [])
+    else:
+        return []
+    return [PlaylistWriter.from_spec(spec) for spec in specs]
+
+
+def generate_playlists(catalog, writers, rank_mirrors=True, in_memory=False):
+    """Fill every writer in one walk of the kinds they need, rendering each entry at most once"""
+    mirror_results = load_mirror_results(catalog) if rank_mirrors else None
+    records = {}
+    try:
+        for writer in writers:
+            writer.open(catalog, in_memory)
+        for kind in KINDS:
+            kind_writers = [writer for writer in writers if kind in writer.kinds]
+            if not kind_writers:
+                continue
+            for entry in ENTRY_ITERATORS[kind](catalog):
+                rendered = None
+                for writer in kind_writers:
+                    if writer.accepts(catalog, kind, entry):
+                        rendered = rendered or render_entry(entry, mirror_results)
+                        writer.write(rendered, entry_key(kind, entry))
+    finally:
+        for writer in writers:
+            records[writer.output] = writer.close()
+
+    if in_memory:
+        return writers
+    save_sections(catalog, records)
+    for writer in writers:
+        print(f'{os.path.basename(writer.output)} generated successfully.')
+    return writers
+
+
+def read_sections(catalog, output, record):
+    """Split an existing playlist into [key, entry text] sections, None if it does not match its record"""
+    try:
+        with open(catalog.path(output), 'r', encoding='utf-8') as f:
+            content = f.read()
+    except FileNotFoundError:
+        return None
+    if not record or hashlib.sha1(content.encode('utf-8')).hexdigest() != record.get('digest'):
+        return None
+
+    sections = []
+    position = len('\n'.join(M3U_HEADER))
+    for section in record['sections']:
+        start = position + 1
+        position = start + section[4]
+        sections.append((section[:4], content[start:position]))
+    return sections if position == len(content) else None
+
+
+def splice_playlists(catalog, writers, changes, rank_mirrors=True):
+    """Re-render only the changed entries of existing playlists, return the writers that need a full run"""
+    records = load_sections(catalog)
+    existing = {}
+    stale = []
+    for writer in writers:
+        # Kinds changed as a whole (bulk imports) are cheaper to regenerate than to splice
+        if any(kind in changes and changes[kind] is None for kind in writer.kinds):
+            stale.append(writer)
+            continue
+        sections = read_sections(catalog, writer.output, records.get(writer.output))
+        if sections is None:
+            stale.append(writer)
+        else:
+            existing[writer.output] = sections
+
+    spliced = [writer for writer in writers if writer.output in existing]
+    fresh = {writer.output: [] for writer in spliced}
+    mirror_results = load_mirror_results(catalog) if rank_mirrors else None
+    for kind in KINDS:
+        titles = changes.get(kind) or {}
+        kind_writers = [writer for writer in spliced if kind in writer.kinds]
+        if not titles or not kind_writers:
+            continue
+        episodes = {slug: keys for slug, keys in titles.items() if keys is not None}
+        for entry in ENTRY_ITERATORS[kind](catalog, sorted(titles), episodes):
+            rendered = None
+            for writer in kind_writers:
+                if writer.accepts(catalog, kind, entry):
+                    rendered = rendered or render_entry(entry, mirror_results)
+                    fresh[writer.output].append((entry_key(kind, entry), rendered))
+
+    new_records = {}
+    for writer in spliced:
+        kept = [section for section in existing[writer.output] if not is_changed(changes, *section[0])]
+        sections = sorted(kept + fresh[writer.output], key=lambda section: section_sort_key(section[0]))
+        if sections == existing[writer.output]:
+            continue
+        writer.open(catalog)
+        try:
+            for key, text in sections:
+                writer.write(text, key)
+        finally:
+            new_records[writer.output] = writer.close()
+        print(f'{os.path.basename(writer.output)} updated ({len(fresh[writer.output])} entries re-rendered).')
+
+    if new_records:
+        save_sections(catalog, new_records)
+    return stale
+
+
+def verify_playlists(catalog, writers, rank_mirrors=True):
+    """Outputs whose file differs from a full regeneration"""
+    generate_playlists(catalog, writers, rank_mirrors, in_memory=True)
+    mismatched = []
+    for writer in writers:
+        try:
+            with open(catalog.path(writer.output), 'r', encoding='utf-8') as f:
+                if f.read() == writer.content:
+                    continue
+        except FileNotFoundError:
+            pass
+        mismatched.append(writer.output)
+    return mismatched
+
+
+def generate_playlist(catalog, kind, output_path=None, rank_mirrors=True):
+    """Write the playlist of one kind, return its path"""
+    output_path = output_path or OUTPUT_FILES[kind]
+    generate_playlists(catalog, [PlaylistWriter(output_path, [kind])], rank_mirrors)
+    return catalog.path(output_path)
+
+
+def add_arguments(parser):
+    parser.add_argument('kinds', nargs='*', metavar='kind',
+                        help='movies and/or tv-series (default: both)')
+    parser.add_argument('--no-rank', action='store_true',
+                        help='keep URLs in submission order instead of the mirrors.json ranking')
+    parser.add_argument('--playlists', metavar='FILE',
+                        help=f'filtered playlists to write as well (default: {PLAYLISTS_FILE} if it exists)')
+    parser.add_argument('--no-playlists', action='store_true', help=f'skip the playlists of {PLAYLISTS_FILE}')
+    parser.add_argument('--changed', action='store_true',
+                        help='only re-render the titles changed by earlier steps (e.g. ingest) and splice them in')
+    parser.add_argument('--changes', metavar='FILE', help='like --changed, with a change set saved by `ingest --changes`')
+    parser.add_argument('--verify', action='store_true',
+                        help='fail if a playlist differs from a full regeneration')
+
+
+def run(args, catalog):
+    unknown = [kind for kind in args.kinds if kind not in OUTPUT_FILES]
+    if unknown:
+        print(f"Error: unknown playlist {', '.join(unknown)}")
+        return 2
+
+    kinds = args.kinds or KIND_CHOICES
+    writers = [PlaylistWriter(OUTPUT_FILES[kind], [kind]) for kind in kinds]
+    if not args.no_playlists:
+        try:
+            extra = load_playlist_writers(catalog, args.playlists)
+        except (OSError, json.JSONDecodeError, ValueError) as e:
+            print(f"Error: could not load playlists: {e}")
+            return 2
+        # Playlists that also hold other kinds are written as well: with --changed the
+        # unchanged kinds are spliced in as they are, otherwise they are walked again
+        writers += [writer for writer in extra if set(writer.kinds) & set(kinds)]
+
+    rank_mirrors = not args.no_rank
+    if args.changed or args.changes:
+        changes = load_changes(args.changes) if args.changes else change_set(catalog)
+        stale = splice_playlists(catalog, writers, changes, rank_mirrors)
+        if stale:
+            print(f"Regenerating {', '.join(writer.output for writer in stale)} in full.")
+            generate_playlists(catalog, stale, rank_mirrors)
+    else:
+        generate_playlists(catalog, writers, rank_mirrors)
+
+    if args.verify:
+        mismatched = verify_playlists(catalog, [PlaylistWriter(writer.output, writer.kinds, writer.filters)
+                                                for writer in writers], rank_mirrors)
+        for output in mismatched:
+            print(f"Error: {output} differs from a full regeneration")
+        if mismatched:
+            return 1
+        print("Playlists match a full regeneration.")
+    return 0
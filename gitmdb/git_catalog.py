@@ -0,0 +1,181 @@
+"""
+Catalog backed by the git object store, for running commands against any
+revision without checking it out:
+
+    python -m gitmdb --rev v1.2 --out /tmp/v1.2 generate + validate
+
+The whole tree of the commit is listed once with `git ls-tree -r -t`, and
+blobs are streamed from one persistent `git cat-file --batch` process. The
+first read inside a title folder fetches every JSON file of that folder in
+one pipelined batch.
+
+Files written by commands (playlists, indexes) go to the output folder and
+are read back from there; the object store is never modified. Removed files
+are hidden from the revision. Generated files are only reused when they were
+written during this run, so the output folder always gets complete indexes
+of the revision, whatever it held before.
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import threading
+
+from gitmdb.catalog import KINDS, Catalog
+
+
+def _git(root, *args):
+    return subprocess.run(['git', '-C', root, *args], capture_output=True, check=True).stdout
+
+
+class GitCatalog(Catalog):
+    """Read-only view of one commit of the repository, plus the files written during this run"""
+
+    def __init__(self, root, rev, output_root):
+        super().__init__(root)
+        try:
+            self.rev = _git(self.root, 'rev-parse', '--verify', f'{rev}^{{commit}}').decode().strip()
+        except subprocess.CalledProcessError as e:
+            raise ValueError(f"Unknown revision '{rev}': {e.stderr.decode().strip()}") from e
+        self.output_root = os.path.abspath(output_root)
+        self._blobs = {}
+        self._trees = {}
+        self._folder_files = {}
+        self._written = set()
+        self._removed = set()
+        self._batch = None
+        os.makedirs(self.output_root, exist_ok=True)
+        self._load_tree()
+
+    def _load_tree(self):
+        trees = {(): []}
+        for record in _git(self.root, 'ls-tree', '-r', '-t', '-z', '--full-tree', self.rev).split(b'\0'):
+            if not record:
+                continue
+            meta, path = record.split(b'\t', 1)
+            _, object_type, sha = meta.split()
+            parts = tuple(path.decode('utf-8').split('/'))
+            is_dir = object_type == b'tree'
+            trees.setdefault(parts[:-1], []).append((parts[-1], is_dir))
+            if is_dir:
+                trees.setdefault(parts, [])
+            elif object_type == b'blob':
+                self._blobs[parts] = sha.decode()
+                if len(parts) > 3 and parts[-1].endswith('.json'):
+                    # Title folders are api/{kind}/{slug} or api/{kind}/{shard}/{slug}
+                    self._folder_files.setdefault(parts[:3], []).append(parts)
+                    self._folder_files.setdefault(parts[:4], []).append(parts)
+        self._trees = {parts: sorted(entries) for parts, entries in trees.items()}
+
+    def path(self, *parts):
+        return os.path.join(self.output_root, *parts)
+
+    def _is_removed(self, parts):
+        return any(parts[:i] in self._removed for i in range(1, len(parts) + 1))
+
+    def exists(self, *parts):
+        if parts in self._written:
+            return True
+        if self._is_removed(parts):
+            return False
+        return parts in self._json or parts in self._blobs or parts in self._trees
+
+    def isdir(self, *parts):
+        return parts in self._trees and not self._is_removed(parts)
+
+    def _scan(self, parts):
+        if self._is_removed(parts):
+            return []
+        return [(name, is_dir) for name, is_dir in self._trees.get(parts, [])
+                if parts + (name,) not in self._removed]
+
+    def output_exists(self, *parts):
+        # Files in the output folder may come from another revision
+        return parts in self._written
+
+    def _cat_file(self):
+        if self._batch is None:
+            self._batch = subprocess.Popen(['git', '-C', self.root, 'cat-file', '--batch'],
+                                           stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        return self._batch
+
+    def read_blobs(self, shas):
+        """Contents of several blobs; requests are written from a thread while the replies are read"""
+        process = self._cat_file()
+
+        def feed():
+            process.stdin.write(''.join(f'{sha}\n' for sha in shas).encode())
+            process.stdin.flush()
+
+        writer = threading.Thread(target=feed)
+        writer.start()
+        contents = []
+        try:
+            for sha in shas:
+                header = process.stdout.readline().split()
+                if len(header) != 3:
+                    raise OSError(f"git cat-file could not read {sha}")
+                contents.append(process.stdout.read(int(header[2])))
+                process.stdout.read(1)
+        finally:
+            writer.join()
+        return contents
+
+    def _prefetch(self, folder):
+        """Parse every JSON file under folder that is not cached yet"""
+        wanted = [parts for parts in self._folder_files.get(folder, ())
+                  if parts not in self._json and parts not in self._written]
+        for parts, content in zip(wanted, self.read_blobs([self._blobs[parts] for parts in wanted])):
+            try:
+                self._json[parts] = json.loads(content.decode('utf-8'))
+            except (UnicodeDecodeError, json.JSONDecodeError):
+                pass  # Raised again by read_json when the file is actually used
+
+    def read_json(self, *parts):
+        if parts in self._json:
+            return self._json[parts]
+        if parts in self._written:
+            return super().read_json(*parts)
+        if parts not in self._blobs or self._is_removed(parts):
+            raise FileNotFoundError(f"{'/'.join(parts)} does not exist at {self.rev}")
+
+        # The other files of the same title (or of api/alts/{kind}) are usually needed next
+        if len(parts) > 3 and parts[0] == 'api' and parts[1] in KINDS + ('alts',):
+            sharded = parts[1] in KINDS and self.layout(parts[1]).get('layout') == 'sharded'
+            self._prefetch(parts[:4] if sharded else parts[:3])
+            if parts in self._json:
+                return self._json[parts]
+        content = self.read_blobs([self._blobs[parts]])[0]
+        self._json[parts] = json.loads(content.decode('utf-8'))
+        return self._json[parts]
+
+    def write_json(self, data, *parts):
+        super().write_json(data, *parts)
+        self._written.add(parts)
+
+    def open_output(self, *parts, binary=False):
+        f = super().open_output(*parts, binary=binary)
+        self._written.add(parts)
+        return f
+
+    def remove(self, *parts):
+        self.remove_tree(*parts)
+
+    def remove_tree(self, *parts):
+        """Hide parts of the revision and delete what this run wrote under it"""
+        path = self.path(*parts)
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        elif os.path.exists(path):
+            os.remove(path)
+        size = len(parts)
+        self._written = {written for written in self._written if written[:size] != parts}
+        self._removed.add(parts)
+        self.invalidate(*parts)
+
+    def close(self):
+        if self._batch is not None:
+            self._batch.stdin.close()
+            self._batch.wait()
+            self._batch = None
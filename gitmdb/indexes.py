@@ -0,0 +1,57 @@
+"""
+`gitmdb build-indexes` - derived lookup files built from the api/ tree
+"""
+
+import importlib
+import json
+
+from gitmdb.alts import update_alt_mapping
+from gitmdb.catalog import KINDS
+
+
+def build_alts_index(catalog):
+    """Add every about.json imdb_id to api/alts, return the number of mappings changed"""
+    changed = 0
+    for kind in KINDS:
+        for slug in catalog.slugs(kind):
+            about_parts = catalog.title_parts(kind, slug) + ('about.json',)
+            if not catalog.exists(*about_parts):
+                continue
+            try:
+                about_data = catalog.read_json(*about_parts)
+            except json.JSONDecodeError:
+                print(f"Warning: Could not decode JSON from {catalog.path(*about_parts)}")
+                continue
+
+            imdb_id = about_data.get('imdb_id')
+            if imdb_id and update_alt_mapping(catalog, kind, imdb_id, about_data.get('title'), slug):
+                changed += 1
+    return changed
+
+
+# name -> (module, function); builder modules are imported on demand
+INDEX_BUILDERS = {
+    'alts': ('gitmdb.indexes', 'build_alts_index'),
+    'snapshot': ('gitmdb.snapshot', 'build_snapshot'),
+    'paths': ('gitmdb.layout', 'build_paths_index'),
+    'browse': ('gitmdb.browse', 'build_browse_index'),
+    'subtitle-search': ('gitmdb.subtitle_search', 'build_subtitle_search_index'),
+}
+
+
+def add_arguments(parser):
+    parser.add_argument('indexes', nargs='*', metavar='index',
+                        help=f"indexes to build: {', '.join(INDEX_BUILDERS)} (default: all)")
+
+
+def run(args, catalog):
+    unknown = [name for name in args.indexes if name not in INDEX_BUILDERS]
+    if unknown:
+        print(f"Error: unknown index {', '.join(unknown)}")
+        return 2
+
+    for name in args.indexes or INDEX_BUILDERS:
+        module_name, func_name = INDEX_BUILDERS[name]
+        changed = getattr(importlib.import_module(module_name), func_name)(catalog)
+        print(f"{name} index built ({changed} files updated).")
+    return 0
@@ -0,0 +1,32 @@
+"""
+`gitmdb ingest` - turn an add-movie / add-tv-series issue into api/ files
+"""
+
+from gitmdb.changes import change_set, save_changes
+from gitmdb.duplicates import DUPLICATE_POLICIES
+
+INGESTERS = {
+    'movie': ('gitmdb.movie_issue', 'process_movie_issue'),
+    'tv-series': ('gitmdb.tv_series_issue', 'process_tv_series_issue'),
+}
+
+
+def add_arguments(parser):
+    parser.add_argument('kind', choices=list(INGESTERS))
+    parser.add_argument('issue_number')
+    parser.add_argument('issue_body')
+    parser.add_argument('--on-duplicate', choices=DUPLICATE_POLICIES, default='merge',
+                        help='merge into a near-duplicate title, only flag it, or skip the check (default: merge)')
+    parser.add_argument('--changes', metavar='FILE',
+                        help='save the touched titles and episodes for a later `generate --changes FILE`')
+
+
+def run(args, catalog):
+    import importlib
+
+    module_name, func_name = INGESTERS[args.kind]
+    process = getattr(importlib.import_module(module_name), func_name)
+    status = process(args.issue_number, args.issue_body, catalog, args.on_duplicate)
+    if args.changes and not status:
+        save_changes(change_set(catalog), args.changes)
+    return status
@@ -0,0 +1,194 @@
+"""
+`gitmdb check-integrity` - cross-reference checks over the whole catalog.
+
+One pass over api/ loads every title, IMDB ID, season/episode folder and
+api/alts mapping into in-memory indexes; the checks then run as set joins
+over those indexes, so the cost grows linearly with the catalog:
+
+    - api/alts slug lists that point to folders which do not exist
+    - about.json IMDB IDs missing from, or disagreeing with, api/alts
+    - series without an s/ folder, seasons without episodes, episode
+      folders without urls.json and non-numeric season/episode folders
+
+`--repair` rebuilds api/alts from the about.json files; folder problems,
+titles without an imdb_id and mappings left with no valid slug are only
+reported. Unreadable JSON is left to `gitmdb validate`.
+"""
+
+import json
+
+from gitmdb.alts import alt_parts
+from gitmdb.catalog import KINDS, TV_SERIES
+
+
+class CatalogIndex:
+    """Slugs, IMDB IDs, episode coordinates and alts mappings of a catalog"""
+
+    def __init__(self):
+        self.titles = {kind: {} for kind in KINDS}  # slug -> about.json data (None if unreadable)
+        self.title_parts = {kind: {} for kind in KINDS}  # slug -> folder path parts
+        self.imdb_slugs = {kind: {} for kind in KINDS}  # imdb_id -> set(slugs) from about.json
+        self.alts = {kind: {} for kind in KINDS}  # imdb_id -> alts mapping
+        self.episodes = set()  # (slug, season, episode)
+        self.issues = []  # (check, path, message) found while loading
+
+    def issue(self, check, parts, message):
+        self.issues.append((check, '/'.join(parts), message))
+
+
+def _imdb_id(about_data):
+    return (about_data.get('imdb_id') or None) if isinstance(about_data, dict) else None
+
+
+def build_catalog_index(catalog):
+    """Load everything the cross-reference checks need in one walk over api/"""
+    index = CatalogIndex()
+    for kind in KINDS:
+        for slug in catalog.slugs(kind):
+            title_parts = catalog.title_parts(kind, slug)
+            about_data = None
+            if catalog.exists(*title_parts, 'about.json'):
+                try:
+                    about_data = catalog.read_json(*title_parts, 'about.json')
+                except json.JSONDecodeError:
+                    pass
+            index.titles[kind][slug] = about_data
+            index.title_parts[kind][slug] = title_parts
+            imdb_id = _imdb_id(about_data)
+            if imdb_id:
+                index.imdb_slugs[kind].setdefault(imdb_id, set()).add(slug)
+
+            if kind == TV_SERIES:
+                _index_episodes(catalog, index, slug, title_parts)
+
+        for filename in catalog.listdir('api', 'alts', kind):
+            parts = ('api', 'alts', kind, filename)
+            if not filename.endswith('.json'):
+                continue
+            try:
+                alt_data = catalog.read_json(*parts)
+            except json.JSONDecodeError:
+                index.issue('alts', parts, "invalid JSON")
+                continue
+            if not isinstance(alt_data, dict) or not isinstance(alt_data.get('slug'), list):
+                index.issue('alts', parts, "expected an object with a 'slug' list")
+                continue
+            index.alts[kind][filename[:-len('.json')]] = alt_data
+    return index
+
+
+def _index_episodes(catalog, index, slug, title_parts):
+    seasons_parts = title_parts + ('s',)
+    if not catalog.isdir(*seasons_parts):
+        index.issue('structure', title_parts, "series has no s/ folder")
+        return
+
+    seasons = catalog.subdirs(*seasons_parts)
+    if not seasons:
+        index.issue('structure', seasons_parts, "series has no seasons")
+    for season in seasons:
+        season_parts = seasons_parts + (season,)
+        if not season.isdigit():
+            index.issue('structure', season_parts, "season folder is not a number")
+            continue
+        episodes = catalog.subdirs(*season_parts, 'e')
+        if not episodes:
+            index.issue('orphans', season_parts, "season has no episodes")
+        for episode in episodes:
+            episode_parts = season_parts + ('e', episode)
+            if not episode.isdigit():
+                index.issue('structure', episode_parts, "episode folder is not a number")
+            elif not catalog.exists(*episode_parts, 'urls.json'):
+                index.issue('orphans', episode_parts, "episode has no urls.json")
+            else:
+                index.episodes.add((slug, int(season), int(episode)))
+
+
+def check_references(index):
+    """Join the alts mappings against the titles and their about.json IMDB IDs"""
+    issues = []
+    for kind in KINDS:
+        titles = index.titles[kind]
+        alts = index.alts[kind]
+        imdb_slugs = index.imdb_slugs[kind]
+
+        for imdb_id, alt_data in sorted(alts.items()):
+            parts = '/'.join(alt_parts(kind, imdb_id))
+            if alt_data.get('type') not in (None, kind):
+                issues.append(('alts', parts, f"type is '{alt_data.get('type')}' instead of '{kind}'"))
+            listed = set(alt_data['slug'])
+            for slug in sorted(listed - titles.keys()):
+                issues.append(('alts', parts, f"lists '{slug}', which has no api/{kind} folder"))
+            for slug in sorted(listed & titles.keys()):
+                about_imdb_id = _imdb_id(titles[slug])
+                if about_imdb_id is None:
+                    issues.append(('about', '/'.join(index.title_parts[kind][slug]),
+                                   f"about.json has no imdb_id, api/alts maps {imdb_id} to it"))
+                elif about_imdb_id != imdb_id:
+                    issues.append(('alts', parts, f"lists '{slug}', whose about.json has imdb_id '{about_imdb_id}'"))
+
+        for imdb_id, slugs in sorted(imdb_slugs.items()):
+            listed = set(alts[imdb_id]['slug']) if imdb_id in alts else set()
+            for slug in sorted(slugs - listed):
+                issues.append(('alts', '/'.join(alt_parts(kind, imdb_id)),
+                               f"missing '{slug}', whose about.json has imdb_id '{imdb_id}'"))
+    return issues
+
+
+def check_integrity(catalog):
+    """Every cross-reference and folder issue of the catalog, as (check, path, message)"""
+    index = build_catalog_index(catalog)
+    return index.issues + check_references(index), index
+
+
+def repair_alts(catalog, index):
+    """Make api/alts agree with the about.json IMDB IDs, return the number of files changed
+
+    Slugs without a folder or with another IMDB ID are dropped and missing ones
+    added. Slugs whose about.json has no imdb_id are kept, since the mapping
+    may be the only record of it. For the same reason a mapping that would be
+    left without any slug (e.g. its title folder was renamed) is not touched.
+    """
+    changed = 0
+    for kind in KINDS:
+        titles = index.titles[kind]
+        alts = index.alts[kind]
+        imdb_slugs = index.imdb_slugs[kind]
+        for imdb_id in sorted(alts.keys() | imdb_slugs.keys()):
+            slugs = imdb_slugs.get(imdb_id, set())
+            alt_data = alts.get(imdb_id)
+            if alt_data is None:
+                alt_data = {'type': kind, 'title': titles[sorted(slugs)[0]].get('title'), 'slug': []}
+
+            # Keep the existing order of slugs that are still valid, append the new ones
+            kept = [slug for slug in alt_data['slug']
+                    if slug in slugs or (slug in titles and _imdb_id(titles[slug]) is None)]
+            updated = dict(alt_data, type=kind, slug=kept + sorted(slugs - set(kept)))
+            parts = alt_parts(kind, imdb_id)
+            if not updated['slug']:
+                continue
+            if updated != alts.get(imdb_id):
+                catalog.write_json(updated, *parts)
+                alts[imdb_id] = updated
+                changed += 1
+    return changed
+
+
+def add_arguments(parser):
+    parser.add_argument('--repair', action='store_true', help='rebuild api/alts from the about.json IMDB IDs')
+
+
+def run(args, catalog):
+    issues, index = check_integrity(catalog)
+    if args.repair and any(check == 'alts' for check, _, _ in issues):
+        changed = repair_alts(catalog, index)
+        print(f"Repaired api/alts ({changed} files changed).")
+        issues, index = check_integrity(catalog)
+
+    for check, path, message in sorted(issues):
+        print(f"[{check}] {path}: {message}")
+
+    titles = sum(len(index.titles[kind]) for kind in KINDS)
+    print(f"\nChecked {titles} titles, {len(index.episodes)} episodes and "
+          f"{sum(len(index.alts[kind]) for kind in KINDS)} alts mappings: {len(issues)} issues.")
+    return 1 if issues else 0
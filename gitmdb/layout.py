@@ -0,0 +1,83 @@
+"""
+`gitmdb migrate-layout` - switch api/movies and api/tv-series between the flat
+and the sharded folder layout, and the api/{kind}/paths.json compatibility index.
+"""
+
+import os
+
+from gitmdb.catalog import DEFAULT_SHARD_WIDTH, KINDS, LAYOUT_FILE
+
+PATHS_FILE = 'paths.json'
+
+
+def build_paths_index(catalog):
+    """Write api/{kind}/paths.json (slug -> folder path) for sharded kinds, return the number of files updated"""
+    changed = 0
+    for kind in KINDS:
+        paths_parts = ('api', kind, PATHS_FILE)
+        if catalog.layout(kind).get('layout') != 'sharded':
+            if catalog.exists(*paths_parts):
+                catalog.remove(*paths_parts)
+                changed += 1
+            continue
+
+        paths = {slug: '/'.join(catalog.title_parts(kind, slug)) for slug in catalog.slugs(kind)}
+        if catalog.exists(*paths_parts) and catalog.read_json(*paths_parts) == paths:
+            continue
+        catalog.write_json(paths, *paths_parts)
+        changed += 1
+    return changed
+
+
+def migrate_layout(catalog, kind, layout, width=DEFAULT_SHARD_WIDTH):
+    """Move every title of a kind into the requested layout, return the number of folders moved"""
+    current = {slug: catalog.title_parts(kind, slug) for slug in catalog.slugs(kind)}
+
+    layout_parts = ('api', kind, LAYOUT_FILE)
+    if layout == 'sharded':
+        catalog.write_json({'layout': 'sharded', 'width': width}, *layout_parts)
+    elif catalog.exists(*layout_parts):
+        catalog.remove(*layout_parts)
+    catalog.clear_cache()
+
+    moved = 0
+    for slug, source_parts in current.items():
+        target_parts = catalog.title_parts(kind, slug)
+        if target_parts == source_parts:
+            continue
+        if os.path.exists(catalog.path(*target_parts)):
+            raise FileExistsError(f"Cannot move {slug}: {catalog.path(*target_parts)} already exists")
+        os.makedirs(catalog.path(*target_parts[:-1]), exist_ok=True)
+        os.rename(catalog.path(*source_parts), catalog.path(*target_parts))
+        moved += 1
+
+        # Drop shard folders left empty by the move
+        source_parent = catalog.path(*source_parts[:-1])
+        if len(source_parts) > 3 and not os.listdir(source_parent):
+            os.rmdir(source_parent)
+
+    catalog.clear_cache()
+    return moved
+
+
+def add_arguments(parser):
+    parser.add_argument('layout', choices=('flat', 'sharded'))
+    parser.add_argument('kinds', nargs='*', metavar='kind', help='movies and/or tv-series (default: both)')
+    parser.add_argument('--width', type=int, default=DEFAULT_SHARD_WIDTH,
+                        help=f'hex digits of sha1(slug) used as shard folder (default: {DEFAULT_SHARD_WIDTH})')
+
+
+def run(args, catalog):
+    if catalog.rev is not None:
+        print("Error: migrate-layout moves folders in place and cannot run against --rev")
+        return 2
+    unknown = [kind for kind in args.kinds if kind not in KINDS]
+    if unknown:
+        print(f"Error: unknown kind {', '.join(unknown)}")
+        return 2
+
+    for kind in args.kinds or KINDS:
+        moved = migrate_layout(catalog, kind, args.layout, args.width)
+        print(f"api/{kind}: {moved} folders moved to the {args.layout} layout.")
+    build_paths_index(catalog)
+    return 0
@@ -0,0 +1,186 @@
+"""
+`gitmdb import-m3u` - bulk import of external M3U playlists.
+
+The playlist is read through mmap one line at a time, so memory use depends on
+the batch size and not on the size of the file. Entries are written through
+create_movie_structure / create_tv_series_structure, the same merge logic used
+for issues, so re-importing a playlist only adds URLs that are missing.
+"""
+
+import mmap
+import os
+import re
+
+from gitmdb.catalog import MOVIES, TV_SERIES
+from gitmdb.changes import record_kind_change
+from gitmdb.duplicates import DUPLICATE_POLICIES
+from gitmdb.movie_issue import create_movie_structure
+from gitmdb.tv_series_issue import create_tv_series_structure
+from gitmdb.utils import slugify
+
+ATTRIBUTE_RE = re.compile(r'([\w-]+)="([^"]*)"')
+EPISODE_RES = (
+    re.compile(r'^(?P<title>.*?)[\s._-]*\bS(?P<season>\d{1,3})[\s._-]*E(?P<episode>\d{1,4})\b', re.IGNORECASE),
+    re.compile(r'^(?P<title>.*?)[\s._-]*\b(?P<season>\d{1,2})x(?P<episode>\d{1,4})\b', re.IGNORECASE),
+)
+SEASON_SUFFIX_RE = re.compile(r'[\s._-]*\b(?:Temporada|Season)\s*\d+\s*$', re.IGNORECASE)
+YEAR_SUFFIX_RE = re.compile(r'^(?P<title>.*?)\s*\((?P<year>\d{4})\)\s*$')
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def parse_extinf(line):
+    """Split an #EXTINF line into its attributes and display title"""
+    header = line[len('#EXTINF:'):]
+    attributes = {}
+
+    # Attributes come before the first comma that is not inside a quoted
+    # value; everything after that comma is the title, quotes included
+    position = 0
+    while True:
+        comma = header.find(',', position)
+        match = ATTRIBUTE_RE.search(header, position)
+        if match is None or (comma != -1 and comma < match.start()):
+            break
+        attributes[match.group(1)] = match.group(2)
+        position = match.end()
+    title = header[comma + 1:].strip() if comma != -1 else ''
+    return attributes, title
+
+
+def iter_m3u_entries(path):
+    """Stream (attributes, title, urls) tuples from an M3U file"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            attributes, title, urls = None, None, []
+            for raw_line in iter(mm.readline, b''):
+                line = raw_line.decode('utf-8', 'replace').strip()
+                if not line:
+                    continue
+
+                if line.startswith('#EXTINF:'):
+                    if attributes is not None and urls:
+                        yield attributes, title, urls
+                    attributes, title = parse_extinf(line)
+                    urls = []
+                elif line.startswith('#EXTGRP:'):
+                    if attributes is not None:
+                        attributes.setdefault('group-title', line[len('#EXTGRP:'):].strip())
+                elif not line.startswith('#') and attributes is not None:
+                    urls.append(line)
+
+            if attributes is not None and urls:
+                yield attributes, title, urls
+
+
+def classify_entry(attributes, title):
+    """Map a playlist entry to ('movie', data, None) or ('tv-series', data, (season, episode))"""
+    group = attributes.get('group-title', '').strip()
+    data = {}
+    if attributes.get('tvg-logo'):
+        data['cover'] = attributes['tvg-logo']
+
+    for episode_re in EPISODE_RES:
+        match = episode_re.search(title)
+        if match:
+            series_title = SEASON_SUFFIX_RE.sub('', match.group('title')).strip(' -._')
+            if not series_title:
+                series_title = SEASON_SUFFIX_RE.sub('', group).strip(' -._')
+            if not series_title:
+                break
+            data['title'] = series_title
+            return 'tv-series', data, (int(match.group('season')), int(match.group('episode')))
+
+    year_match = YEAR_SUFFIX_RE.match(title)
+    if year_match:
+        data['title'] = year_match.group('title')
+        data['year'] = int(year_match.group('year'))
+    else:
+        data['title'] = title
+    if group:
+        data['category'] = group
+    return 'movie', data, None
+
+
+class BatchWriter:
+    """Group imported entries per title and write them every batch_size entries"""
+
+    def __init__(self, catalog, source, batch_size=DEFAULT_BATCH_SIZE, on_duplicate='merge'):
+        self.catalog = catalog
+        self.source = source
+        self.batch_size = batch_size
+        self.on_duplicate = on_duplicate
+        self.movies = {}
+        self.series = {}
+        self.pending = 0
+        self.written = 0
+
+    def add(self, attributes, title, urls):
+        kind, data, coordinates = classify_entry(attributes, title)
+        if not data.get('title') or not slugify(data['title']):
+            return False
+
+        url_objects = [{'source': self.source, 'url': url} for url in urls]
+        if kind == 'movie':
+            key = (slugify(data['title']), data.get('year'))
+            _, movie_urls = self.movies.setdefault(key, (data, []))
+            movie_urls.extend(url_objects)
+        else:
+            season, episode = coordinates
+            _, episodes = self.series.setdefault(slugify(data['title']), (data, {}))
+            episodes.setdefault(season, {}).setdefault(episode, []).extend(url_objects)
+
+        self.pending += 1
+        if self.pending >= self.batch_size:
+            self.flush()
+        return True
+
+    def flush(self):
+        for data, urls in self.movies.values():
+            create_movie_structure(data, urls, None, self.catalog, self.on_duplicate)
+        for data, episodes in self.series.values():
+            create_tv_series_structure(data, episodes, None, self.catalog, self.on_duplicate)
+
+        # A per-episode change set would grow with the playlist; record whole kinds instead
+        if self.movies:
+            record_kind_change(self.catalog, MOVIES)
+        if self.series:
+            record_kind_change(self.catalog, TV_SERIES)
+
+        self.written += self.pending
+        self.movies, self.series, self.pending = {}, {}, 0
+        self.catalog.clear_cache()
+
+
+def import_m3u(catalog, path, source=None, batch_size=DEFAULT_BATCH_SIZE, on_duplicate='merge'):
+    """Import every entry of an M3U file, return (imported, skipped) counts"""
+    # The file name only: a local path would end up in the published urls.json files
+    writer = BatchWriter(catalog, source or os.path.basename(path), batch_size, on_duplicate)
+    skipped = 0
+    for attributes, title, urls in iter_m3u_entries(path):
+        if not writer.add(attributes, title, urls):
+            print(f"Warning: Could not map entry '{title}'")
+            skipped += 1
+    writer.flush()
+    return writer.written, skipped
+
+
+def add_arguments(parser):
+    parser.add_argument('playlist', help='path of the M3U file to import')
+    parser.add_argument('--source', help='value stored in the urls.json source field (default: the playlist file name)')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f'entries written per batch (default: {DEFAULT_BATCH_SIZE})')
+    parser.add_argument('--on-duplicate', choices=DUPLICATE_POLICIES, default='merge',
+                        help='merge into a near-duplicate title, only flag it, or skip the check (default: merge)')
+
+
+def run(args, catalog):
+    if not os.path.isfile(args.playlist):
+        print(f"Error: {args.playlist} not found")
+        return 1
+
+    imported, skipped = import_m3u(catalog, args.playlist, args.source, max(args.batch_size, 1), args.on_duplicate)
+    print(f"Imported {imported} entries from {args.playlist} ({skipped} skipped).")
+    return 0
@@ -0,0 +1,135 @@
+"""
+`gitmdb rank-mirrors` - measure how fast each mirror of an entry responds.
+
+Every URL of an entry with several mirrors is probed with a small ranged GET
+that records time-to-first-byte and throughput. Results are kept in
+mirrors.json and re-probed once they are older than the TTL; the playlist
+generators use them to emit URLs fastest-first.
+"""
+
+import http.client
+import json
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+MIRRORS_FILE = 'mirrors.json'
+MIRRORS_VERSION = 1
+
+DEFAULT_TTL = 7 * 24 * 3600
+DEFAULT_CONCURRENCY = 8
+DEFAULT_SAMPLE_BYTES = 256 * 1024
+DEFAULT_TIMEOUT = 10
+
+
+def probe_url(url, sample_bytes=DEFAULT_SAMPLE_BYTES, timeout=DEFAULT_TIMEOUT):
+    """Download the first sample_bytes of url and return its measurement"""
+    request = urllib.request.Request(url, headers={
+        'Range': f'bytes=0-{sample_bytes - 1}',
+        'User-Agent': 'gitmdb-mirror-probe',
+    })
+    checked_at = int(time.time())
+    start = time.monotonic()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            received = len(response.read(1))
+            ttfb = time.monotonic() - start
+            while received < sample_bytes:
+                chunk = response.read(min(64 * 1024, sample_bytes - received))
+                if not chunk:
+                    break
+                received += len(chunk)
+        elapsed = time.monotonic() - start
+    except (urllib.error.URLError, http.client.HTTPException, OSError, ValueError) as e:
+        return {'ok': False, 'error': str(e), 'checked_at': checked_at}
+
+    return {
+        'ok': True,
+        'ttfb': round(ttfb, 4),
+        'throughput': int(received / max(elapsed, 1e-6)),
+        'bytes': received,
+        'checked_at': checked_at,
+    }
+
+
+def load_mirror_results(catalog):
+    """Stored results keyed by URL, empty if mirrors.json does not exist"""
+    if not catalog.exists(MIRRORS_FILE):
+        return {}
+    try:
+        return catalog.read_json(MIRRORS_FILE).get('results', {})
+    except (json.JSONDecodeError, AttributeError):
+        print(f"Warning: Could not decode JSON from {catalog.path(MIRRORS_FILE)}")
+        return {}
+
+
+def save_mirror_results(catalog, results):
+    with catalog.open_output(MIRRORS_FILE) as f:
+        json.dump({'version': MIRRORS_VERSION, 'results': results}, f, indent=4, sort_keys=True, ensure_ascii=False)
+
+
+def mirror_sort_key(results):
+    """Sort key for rank_urls: measured mirrors fastest-first, then unmeasured, then failing ones"""
+    def key(url):
+        result = results.get(url)
+        if not result:
+            return (1, 0, 0)
+        if not result.get('ok'):
+            return (2, 0, 0)
+        return (0, -result.get('throughput', 0), result.get('ttfb', 0))
+    return key
+
+
+def rank_urls(urls, results):
+    """Order the URLs of one entry fastest-first; unmeasured URLs keep their relative order"""
+    if len(urls) < 2 or not results:
+        return urls
+    return sorted(urls, key=mirror_sort_key(results))
+
+
+def iter_mirror_groups(catalog):
+    """Yield the URL lists of every movie and episode with more than one mirror"""
+    from gitmdb.generate import ENTRY_ITERATORS
+
+    for iter_entries in ENTRY_ITERATORS.values():
+        for entry in iter_entries(catalog):
+            if len(entry['urls']) > 1:
+                yield entry['urls']
+
+
+def rank_mirrors(catalog, ttl=DEFAULT_TTL, concurrency=DEFAULT_CONCURRENCY,
+                 sample_bytes=DEFAULT_SAMPLE_BYTES, timeout=DEFAULT_TIMEOUT, probe=probe_url):
+    """Probe stale or unmeasured mirrors with at most `concurrency` requests in flight, return the probe count"""
+    results = load_mirror_results(catalog)
+    now = int(time.time())
+
+    urls = {}
+    for group in iter_mirror_groups(catalog):
+        urls.update(dict.fromkeys(group))
+    stale = [url for url in urls if now - results.get(url, {}).get('checked_at', 0) >= ttl]
+
+    with ThreadPoolExecutor(max_workers=max(concurrency, 1)) as executor:
+        for url, result in zip(stale, executor.map(lambda url: probe(url, sample_bytes, timeout), stale)):
+            results[url] = result
+
+    # Forget URLs that are no longer in the catalog
+    save_mirror_results(catalog, {url: result for url, result in results.items() if url in urls})
+    return len(stale)
+
+
+def add_arguments(parser):
+    parser.add_argument('--ttl', type=int, default=DEFAULT_TTL,
+                        help=f'seconds before a measurement is probed again (default: {DEFAULT_TTL})')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help=f'maximum probes in flight (default: {DEFAULT_CONCURRENCY})')
+    parser.add_argument('--sample-bytes', type=int, default=DEFAULT_SAMPLE_BYTES,
+                        help=f'bytes downloaded per probe (default: {DEFAULT_SAMPLE_BYTES})')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                        help=f'seconds before a probe fails (default: {DEFAULT_TIMEOUT})')
+
+
+def run(args, catalog):
+    probed = rank_mirrors(catalog, args.ttl, args.concurrency, max(args.sample_bytes, 1), args.timeout)
+    print(f"{MIRRORS_FILE} updated ({probed} mirrors probed).")
+    return 0
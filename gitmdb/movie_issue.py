@@ -0,0 +1,261 @@
+"""
+Parse add-movie issues and write them into api/movies
+"""
+
+import re
+
+from gitmdb.alts import update_alt_mapping
+from gitmdb.catalog import MOVIES, Catalog
+from gitmdb.changes import record_change
+from gitmdb.duplicates import resolve_slug
+from gitmdb.utils import merge_urls, slugify
+
+
+def parse_movie_issue(issue_body):
+    """Parse movie issue body and extract information"""
+    data = {}
+
+    # Check if this is from issue form (contains ### format) or old template
+    if '### Movie Title' in issue_body or '### Release Year' in issue_body:
+        # Parse GitHub Issue Form format (complex)
+        return parse_issue_form_movie(issue_body)
+    elif '### Movie Title' in issue_body or 'Movie Title' in issue_body:
+        # Parse simple GitHub Issue Form format
+        return parse_simple_issue_form_movie(issue_body)
+    else:
+        # Parse old markdown template format
+        return parse_markdown_template_movie(issue_body)
+
+
+def parse_issue_form_movie(issue_body):
+    """Parse movie issue from GitHub Issue Form"""
+    data = {}
+    urls = []
+
+    # Extract title
+    title_match = re.search(r'### Movie Title\s*\n\s*(.+)', issue_body, re.IGNORECASE)
+    if title_match:
+        data['title'] = title_match.group(1).strip()
+
+    # Extract year
+    year_match = re.search(r'### Release Year\s*\n\s*(\d{4})', issue_body, re.IGNORECASE)
+    if year_match:
+        data['year'] = int(year_match.group(1))
+
+    # Extract source
+    source_match = re.search(r'### Source\s*\n\s*(.+)', issue_body, re.IGNORECASE)
+    source = source_match.group(1).strip() if source_match else 'GitHub Issue Form'
+
+    # Extract primary URL
+    primary_url_match = re.search(r'### Primary Streaming URL\s*\n\s*(https?://\S+)', issue_body, re.IGNORECASE)
+    if primary_url_match:
+        urls.append({
+            'source': source,
+            'url': primary_url_match.group(1),
+            'quality': '1080p',
+            'language': 'en'
+        })
+
+    # Extract alternative URLs
+    alt_urls_match = re.search(r'### Alternative URLs \(Optional\)\s*\n\s*(.*?)(?=\n### |$)', issue_body, re.IGNORECASE | re.DOTALL)
+    if alt_urls_match:
+        alt_urls_text = alt_urls_match.group(1).strip()
+        if alt_urls_text and alt_urls_text != '_No response_':
+            lines = alt_urls_text.split('\n')
+            for line in lines:
+                line = line.strip()
+                if line and line.startswith('http'):
+                    urls.append({
+                        'source': source,
+                        'url': line,
+                        'quality': '1080p',
+                        'language': 'en'
+                    })
+
+    # Extract IMDB ID
+    imdb_match = re.search(r'### IMDB ID \(Optional\)\s*\n\s*(tt\d+)', issue_body, re.IGNORECASE)
+    if imdb_match:
+        data['imdb_id'] = imdb_match.group(1)
+
+    # Extract cover URL
+    cover_match = re.search(r'### Cover/Poster URL \(Optional\)\s*\n\s*(https?://\S+)', issue_body, re.IGNORECASE)
+    if cover_match:
+        data['cover'] = cover_match.group(1)
+
+    # Extract summary
+    summary_match = re.search(r'### Summary \(Optional\)\s*\n\s*(.*?)(?=\n### |$)', issue_body, re.IGNORECASE | re.DOTALL)
+    if summary_match:
+        summary = summary_match.group(1).strip()
+        if summary and summary != '_No response_':
+            data['summary'] = summary
+
+    return data, urls
+
+
+def parse_simple_issue_form_movie(issue_body):
+    """Parse movie issue from simple GitHub Issue Form"""
+    data = {}
+    urls = []
+
+    # Extract title (simple format without complex headers)
+    title_match = re.search(r'### Movie Title\s*\n\s*(.+)', issue_body, re.IGNORECASE)
+    if title_match:
+        data['title'] = title_match.group(1).strip()
+
+    # Extract year
+    year_match = re.search(r'### Release Year\s*\n\s*(\d{4})', issue_body, re.IGNORECASE)
+    if year_match:
+        data['year'] = int(year_match.group(1))
+
+    # Extract source
+    source_match = re.search(r'### Source\s*\n\s*(.+)', issue_body, re.IGNORECASE)
+    source = source_match.group(1).strip() if source_match else 'GitHub Issue Simple'
+
+    # Extract URLs from textarea
+    urls_match = re.search(r'### Movie URLs\s*\n\s*(.*?)(?=\n### |$)', issue_body, re.IGNORECASE | re.DOTALL)
+    if urls_match:
+        urls_text = urls_match.group(1).strip()
+        if urls_text and urls_text != '_No response_':
+            lines = urls_text.split('\n')
+            for line in lines:
+                line = line.strip()
+                if line and line.startswith('http'):
+                    urls.append({
+                        'source': source,
+                        'url': line,
+                        'quality': '1080p',
+                        'language': 'en'
+                    })
+
+    return data, urls
+
+
+def parse_markdown_template_movie(issue_body):
+    """Parse movie issue from old markdown template format"""
+    data = {}
+
+    # Extract title
+    title_match = re.search(r'\*\*Title:\*\*\s*(.+)', issue_body, re.IGNORECASE)
+    if title_match:
+        data['title'] = title_match.group(1).strip()
+
+    # Extract year
+    year_match = re.search(r'\*\*Year:\*\*\s*(\d{4})', issue_body, re.IGNORECASE)
+    if year_match:
+        data['year'] = int(year_match.group(1))
+
+    # Extract URLs
+    urls = []
+
+    # Primary URL
+    primary_url_match = re.search(r'\*\*Primary URL:\*\*\s*(https?://\S+)', issue_body, re.IGNORECASE)
+    if primary_url_match:
+        urls.append({
+            'source': 'GitHub Issue',
+            'url': primary_url_match.group(1),
+            'quality': '1080p',
+            'language': 'en'
+        })
+
+    # Alternative URLs - look for URLs in the code block
+    alt_urls_section = re.search(r'\*\*Alternative URLs.*:\*\*\s*```\s*(.*?)\s*```', issue_body, re.IGNORECASE | re.DOTALL)
+    if alt_urls_section:
+        alt_urls_text = alt_urls_section.group(1).strip()
+        if alt_urls_text:
+            lines = alt_urls_text.split('\n')
+            for line in lines:
+                line = line.strip()
+                if line and line.startswith('http'):
+                    urls.append({
+                        'source': 'GitHub Issue',
+                        'url': line,
+                        'quality': '1080p',
+                        'language': 'en'
+                    })
+
+    return data, urls
+
+
+def create_movie_structure(data, urls, issue_number, catalog=None, on_duplicate='merge'):
+    """Create movie folder structure and files"""
+    if not data.get('title'):
+        raise ValueError("Movie title is required")
+    catalog = catalog or Catalog()
+
+    # Generate slug
+    slug = slugify(data['title'])
+    if data.get('year'):
+        slug = f"{slug}-{data['year']}"
+    requested_slug = slug
+    slug = resolve_slug(catalog, MOVIES, slug, data['title'], data.get('year'), on_duplicate)
+
+    # Create folder path
+    movie_parts = catalog.title_parts(MOVIES, slug)
+    catalog.makedirs(*movie_parts)
+
+    # Check if about.json already exists
+    about_parts = movie_parts + ('about.json',)
+    if catalog.exists(*about_parts):
+        # Merge new data with existing, keeping existing values if new ones are not provided
+        about_data = catalog.read_json(*about_parts).copy()
+        for key, value in data.items():
+            if key == 'title' and slug != requested_slug:
+                continue  # Merged into a near-duplicate, keep its title
+            if value:  # Only update if new value is not empty
+                about_data[key] = value
+    else:
+        # Create new about.json
+        about_data = {
+            'title': data['title'],
+            'category': data.get('category') or 'Movies'
+        }
+
+        for key in ('year', 'summary', 'cover', 'imdb_id', 'tmdb_id', 'genre'):
+            if data.get(key):
+                about_data[key] = data[key]
+
+    catalog.write_json(about_data, *about_parts)
+
+    # Handle URLs - merge with existing if file exists
+    urls_parts = movie_parts + ('urls.json',)
+    if urls:
+        if catalog.exists(*urls_parts):
+            existing_urls = catalog.read_json(*urls_parts)
+            added_count = merge_urls(existing_urls, urls)
+            catalog.write_json(existing_urls, *urls_parts)
+
+            print(f"Added {added_count} new URLs to existing movie: {data['title']}")
+        else:
+            catalog.write_json(urls, *urls_parts)
+
+            print(f"Created new movie: {data['title']}")
+
+    # Create alternative mapping if IMDB ID is provided
+    if data.get('imdb_id'):
+        update_alt_mapping(catalog, MOVIES, data['imdb_id'], data['title'], slug)
+
+    record_change(catalog, MOVIES, slug)
+    return slug
+
+
+def process_movie_issue(issue_number, issue_body, catalog=None, on_duplicate='merge'):
+    """Parse an add-movie issue and write it, return the exit status"""
+    try:
+        data, urls = parse_movie_issue(issue_body)
+
+        if not data.get('title'):
+            print("Error: Movie title is required")
+            return 1
+
+        if not urls:
+            print("Error: At least one streaming URL is required")
+            return 1
+
+        create_movie_structure(data, urls, issue_number, catalog, on_duplicate)
+        print(f"Successfully processed movie issue #{issue_number}: {data['title']}")
+
+    except Exception as e:
+        print(f"Error processing movie issue: {str(e)}")
+        return 1
+
+    return 0
@@ -0,0 +1,156 @@
+"""
+Minimal MessagePack encoder / streaming decoder.
+
+Only the types the catalog snapshot needs are supported: nil, bool, int,
+float, str, array and map. Kept in-tree so the tooling stays stdlib-only.
+"""
+
+import struct
+
+
+def pack(obj, out):
+    """Append the MessagePack encoding of obj to the bytearray out"""
+    if obj is None:
+        out.append(0xc0)
+    elif obj is True:
+        out.append(0xc3)
+    elif obj is False:
+        out.append(0xc2)
+    elif isinstance(obj, int):
+        _pack_int(obj, out)
+    elif isinstance(obj, float):
+        out.append(0xcb)
+        out += struct.pack('>d', obj)
+    elif isinstance(obj, str):
+        data = obj.encode('utf-8')
+        size = len(data)
+        if size < 32:
+            out.append(0xa0 | size)
+        elif size < 0x100:
+            out += bytes((0xd9, size))
+        elif size < 0x10000:
+            out.append(0xda)
+            out += struct.pack('>H', size)
+        else:
+            out.append(0xdb)
+            out += struct.pack('>I', size)
+        out += data
+    elif isinstance(obj, (list, tuple)):
+        _pack_header(len(obj), 0x90, 0xdc, out)
+        for item in obj:
+            pack(item, out)
+    elif isinstance(obj, dict):
+        _pack_header(len(obj), 0x80, 0xde, out)
+        for key, value in obj.items():
+            pack(key, out)
+            pack(value, out)
+    else:
+        raise TypeError(f"Cannot pack {type(obj).__name__}")
+    return out
+
+
+def packb(obj):
+    return bytes(pack(obj, bytearray()))
+
+
+def _pack_header(size, fix_marker, marker16, out):
+    if size < 16:
+        out.append(fix_marker | size)
+    elif size < 0x10000:
+        out.append(marker16)
+        out += struct.pack('>H', size)
+    else:
+        out.append(marker16 + 1)
+        out += struct.pack('>I', size)
+
+
+def _pack_int(value, out):
+    if 0 <= value < 0x80:
+        out.append(value)
+    elif -32 <= value < 0:
+        out.append(value & 0xff)
+    elif value >= 0:
+        for marker, fmt, limit in ((0xcc, '>B', 0x100), (0xcd, '>H', 0x10000), (0xce, '>I', 0x100000000), (0xcf, '>Q', 1 << 64)):
+            if value < limit:
+                out.append(marker)
+                out += struct.pack(fmt, value)
+                return
+        raise OverflowError("Integer too large to pack")
+    else:
+        for marker, fmt, limit in ((0xd0, '>b', 1 << 7), (0xd1, '>h', 1 << 15), (0xd2, '>i', 1 << 31), (0xd3, '>q', 1 << 63)):
+            if value >= -limit:
+                out.append(marker)
+                out += struct.pack(fmt, value)
+                return
+        raise OverflowError("Integer too small to pack")
+
+
+_FIXED_FORMATS = {
+    0xcc: '>B', 0xcd: '>H', 0xce: '>I', 0xcf: '>Q',
+    0xd0: '>b', 0xd1: '>h', 0xd2: '>i', 0xd3: '>q',
+    0xca: '>f', 0xcb: '>d',
+}
+
+
+class Unpacker:
+    """Decode consecutive MessagePack objects from a binary file object"""
+
+    def __init__(self, fp):
+        self.fp = fp
+
+    def __iter__(self):
+        while True:
+            marker = self.fp.read(1)
+            if not marker:
+                return
+            yield self._unpack(marker[0])
+
+    def _read(self, size):
+        data = self.fp.read(size)
+        if len(data) != size:
+            raise ValueError("Truncated MessagePack data")
+        return data
+
+    def _size(self, fmt):
+        return struct.unpack(fmt, self._read(struct.calcsize(fmt)))[0]
+
+    def _unpack(self, marker):
+        if marker < 0x80:
+            return marker
+        if marker >= 0xe0:
+            return marker - 0x100
+        if 0xa0 <= marker <= 0xbf:
+            return self._read(marker & 0x1f).decode('utf-8')
+        if 0x90 <= marker <= 0x9f:
+            return self._array(marker & 0x0f)
+        if 0x80 <= marker <= 0x8f:
+            return self._map(marker & 0x0f)
+        if marker == 0xc0:
+            return None
+        if marker == 0xc2:
+            return False
+        if marker == 0xc3:
+            return True
+        if marker in _FIXED_FORMATS:
+            return self._size(_FIXED_FORMATS[marker])
+        if marker in (0xd9, 0xda, 0xdb):
+            size = self._size({0xd9: '>B', 0xda: '>H', 0xdb: '>I'}[marker])
+            return self._read(size).decode('utf-8')
+        if marker in (0xdc, 0xdd):
+            return self._array(self._size('>H' if marker == 0xdc else '>I'))
+        if marker in (0xde, 0xdf):
+            return self._map(self._size('>H' if marker == 0xde else '>I'))
+        raise ValueError(f"Unsupported MessagePack type 0x{marker:02x}")
+
+    def _next(self):
+        return self._unpack(self._read(1)[0])
+
+    def _array(self, size):
+        return [self._next() for _ in range(size)]
+
+    def _map(self, size):
+        result = {}
+        for _ in range(size):
+            key = self._next()
+            result[key] = self._next()
+        return result
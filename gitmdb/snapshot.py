@@ -0,0 +1,221 @@
+"""
+Binary snapshot of the whole catalog (catalog.msgpack).
+
+The file is a sequence of MessagePack objects so clients can decode it
+record by record:
+
+    {"format": "gitmdb-snapshot", "version": 1}
+    [0, slug, title, year, category*, cover*, urls]        movie
+    [1, slug, title, year, category*, cover*, seasons]     tv series
+
+    seasons: [[number, title, cover*, episodes], ...]
+    episodes: [[number, title, urls], ...]
+    urls: [[url, source*, quality*, language*], ...]
+
+Fields marked * are interned: the first occurrence of a string is written
+inline and every later occurrence as the integer index of that first
+occurrence (strings are numbered in the order they first appear).
+"""
+
+import json
+
+from gitmdb.catalog import MOVIES, TV_SERIES
+from gitmdb.packing import Unpacker, pack
+from gitmdb.utils import numeric_sort_key
+
+SNAPSHOT_FORMAT = 'gitmdb-snapshot'
+SNAPSHOT_VERSION = 1
+SNAPSHOT_FILE = 'catalog.msgpack'
+
+MOVIE_RECORD = 0
+TV_SERIES_RECORD = 1
+
+
+class StringTable:
+    """Encoder side of the interned string fields"""
+
+    def __init__(self):
+        self.indexes = {}
+
+    def ref(self, value):
+        if value is None:
+            return None
+        value = str(value)
+        if value in self.indexes:
+            return self.indexes[value]
+        self.indexes[value] = len(self.indexes)
+        return value
+
+
+class StringResolver:
+    """Decoder side of the interned string fields"""
+
+    def __init__(self):
+        self.strings = []
+
+    def resolve(self, value):
+        if value is None:
+            return None
+        if isinstance(value, int):
+            return self.strings[value]
+        self.strings.append(value)
+        return value
+
+
+def _folder_number(name):
+    return int(name) if name.isdigit() else name
+
+
+def _read_optional_json(catalog, parts, default):
+    if not catalog.exists(*parts):
+        return default
+    try:
+        return catalog.read_json(*parts)
+    except json.JSONDecodeError:
+        print(f"Warning: Could not decode JSON from {catalog.path(*parts)}")
+        return default
+
+
+def _read_urls(catalog, parts):
+    urls_data = _read_optional_json(catalog, parts, [])
+    if not isinstance(urls_data, list):
+        return []
+    return [
+        [item['url'], item.get('source') or item.get('origin'), item.get('quality'), item.get('language')]
+        for item in urls_data
+        if item and isinstance(item, dict) and item.get('url')
+    ]
+
+
+def iter_raw_records(catalog):
+    """Yield every movie and series record with interned fields still as plain values"""
+    for slug in catalog.slugs(MOVIES):
+        movie_parts = catalog.title_parts(MOVIES, slug)
+        about = _read_optional_json(catalog, movie_parts + ('about.json',), {})
+        urls = _read_urls(catalog, movie_parts + ('urls.json',))
+        if urls:
+            yield [MOVIE_RECORD, slug, about.get('title'), about.get('year'),
+                   about.get('category'), about.get('cover'), urls]
+
+    for slug in catalog.slugs(TV_SERIES):
+        series_parts = catalog.title_parts(TV_SERIES, slug)
+        about = _read_optional_json(catalog, series_parts + ('about.json',), {})
+        seasons = []
+        seasons_parts = series_parts + ('s',)
+        for season in sorted(catalog.subdirs(*seasons_parts), key=numeric_sort_key):
+            season_parts = seasons_parts + (season,)
+            season_about = _read_optional_json(catalog, season_parts + ('about.json',), {})
+            episodes = []
+            episodes_parts = season_parts + ('e',)
+            for episode in sorted(catalog.subdirs(*episodes_parts), key=numeric_sort_key):
+                episode_parts = episodes_parts + (episode,)
+                urls = _read_urls(catalog, episode_parts + ('urls.json',))
+                if urls:
+                    info = _read_optional_json(catalog, episode_parts + ('info.json',), {})
+                    episodes.append([_folder_number(episode), info.get('title'), urls])
+            if episodes:
+                seasons.append([_folder_number(season), season_about.get('title'), season_about.get('cover'), episodes])
+        if seasons:
+            yield [TV_SERIES_RECORD, slug, about.get('title'), about.get('year'),
+                   about.get('category'), about.get('cover'), seasons]
+
+
+def _intern_urls(urls, strings):
+    return [[url, strings.ref(source), strings.ref(quality), strings.ref(language)]
+            for url, source, quality, language in urls]
+
+
+def intern_record(record, strings):
+    """Replace interned fields by table references, in the order the decoder reads them"""
+    record_type, slug, title, year, category, cover, children = record
+    category, cover = strings.ref(category), strings.ref(cover)
+    if record_type == MOVIE_RECORD:
+        children = _intern_urls(children, strings)
+    else:
+        interned_seasons = []
+        for number, season_title, season_cover, episodes in children:
+            season_cover = strings.ref(season_cover)
+            interned_seasons.append([number, season_title, season_cover, [
+                [episode, episode_title, _intern_urls(urls, strings)] for episode, episode_title, urls in episodes
+            ]])
+        children = interned_seasons
+    return [record_type, slug, title, year, category, cover, children]
+
+
+def encode_snapshot(catalog):
+    """Encode the catalog into snapshot bytes"""
+    out = bytearray()
+    pack({'format': SNAPSHOT_FORMAT, 'version': SNAPSHOT_VERSION}, out)
+    strings = StringTable()
+    for record in iter_raw_records(catalog):
+        pack(intern_record(record, strings), out)
+    return bytes(out)
+
+
+def build_snapshot(catalog, output_path=None):
+    """Write catalog.msgpack, return 1 if its content changed"""
+    output_path = output_path or catalog.path(SNAPSHOT_FILE)
+    content = encode_snapshot(catalog)
+    try:
+        with open(output_path, 'rb') as f:
+            if f.read() == content:
+                return 0
+    except FileNotFoundError:
+        pass
+
+    if output_path == catalog.path(SNAPSHOT_FILE):
+        f = catalog.open_output(SNAPSHOT_FILE, binary=True)
+    else:
+        f = open(output_path, 'wb')
+    with f:
+        f.write(content)
+    return 1
+
+
+def _decode_urls(urls, strings):
+    return [
+        {'url': url, 'source': strings.resolve(source), 'quality': strings.resolve(quality),
+         'language': strings.resolve(language)}
+        for url, source, quality, language in urls
+    ]
+
+
+def iter_snapshot(fp):
+    """Stream decoded movie / series dicts from a binary snapshot file object"""
+    unpacker = iter(Unpacker(fp))
+    header = next(unpacker, None)
+    if not isinstance(header, dict) or header.get('format') != SNAPSHOT_FORMAT:
+        raise ValueError("Not a gitmdb catalog snapshot")
+    if header.get('version') != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version {header.get('version')}")
+
+    strings = StringResolver()
+    for record_type, slug, title, year, category, cover, children in unpacker:
+        # Resolve in encoding order so string indexes stay in sync
+        entry = {
+            'slug': slug,
+            'title': title,
+            'year': year,
+            'category': strings.resolve(category),
+            'cover': strings.resolve(cover),
+        }
+        if record_type == MOVIE_RECORD:
+            entry['type'] = MOVIES
+            entry['urls'] = _decode_urls(children, strings)
+        else:
+            entry['type'] = TV_SERIES
+            entry['seasons'] = [
+                {'number': number, 'title': season_title, 'cover': strings.resolve(season_cover),
+                 'episodes': [
+                     {'number': episode, 'title': episode_title, 'urls': _decode_urls(urls, strings)}
+                     for episode, episode_title, urls in episodes
+                 ]}
+                for number, season_title, season_cover, episodes in children
+            ]
+        yield entry
+
+
+def load_snapshot(path):
+    """Decode a snapshot file into a list of entries"""
+    with open(path, 'rb') as f:
+        return list(iter_snapshot(f))
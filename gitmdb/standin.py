@@ -0,0 +1,148 @@
+"""
+`gitmdb serve` - local stand-in for raw.githubusercontent.com and the GitHub
+git trees API over a checkout, for developing and testing GitmdbClient.
+
+    GET /{path}                                      file content, with ETag / Last-Modified
+    GET /repos/{owner}/{repo}/git/trees/{ref}:{path} recursive tree listing of a folder
+
+Point the client at it with GitmdbClient(raw_url=url, api_url=url).
+"""
+
+import email.utils
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+TREES_RE = re.compile(r'^/repos/[^/]+/[^/]+/git/trees/[^:/]+:(.*)$')
+
+
+def resolve(root, path):
+    """Absolute path of a checkout path, None if it points outside the checkout or into .git"""
+    resolved = os.path.realpath(os.path.join(root, *path.strip('/').split('/')))
+    real_root = os.path.realpath(root)
+    if resolved != real_root and not resolved.startswith(real_root + os.sep):
+        return None
+    # .git/config can hold the credentials of actions/checkout
+    if '.git' in os.path.relpath(resolved, real_root).split(os.sep):
+        return None
+    return resolved
+
+
+def content_type(path):
+    """Content-Type of a served file; JSON for tree listings"""
+    if path is None:
+        return 'application/json; charset=utf-8'
+    guessed, _ = mimetypes.guess_type(path)
+    guessed = guessed or 'application/octet-stream'
+    if guessed.startswith('text/') or guessed == 'application/json' or 'mpegurl' in guessed:
+        guessed += '; charset=utf-8'
+    return guessed
+
+
+def tree_listing(root, path):
+    """Git trees API response for a folder of the checkout, None if it does not exist"""
+    folder = resolve(root, path)
+    if folder is None or not os.path.isdir(folder):
+        return None
+
+    tree = []
+    for dirpath, dirnames, filenames in os.walk(folder):
+        dirnames[:] = sorted(name for name in dirnames if name != '.git')
+        rel_dir = os.path.relpath(dirpath, folder)
+        for name in dirnames:
+            tree.append({'path': os.path.normpath(os.path.join(rel_dir, name)).replace(os.sep, '/'), 'type': 'tree'})
+        for name in sorted(filenames):
+            try:
+                size = os.path.getsize(os.path.join(dirpath, name))
+            except OSError:
+                continue  # Dangling symlink or file removed during the walk
+            tree.append({
+                'path': os.path.normpath(os.path.join(rel_dir, name)).replace(os.sep, '/'),
+                'type': 'blob',
+                'size': size,
+            })
+    tree.sort(key=lambda item: item['path'])
+    sha = hashlib.sha1(json.dumps(tree, sort_keys=True).encode('utf-8')).hexdigest()
+    return {'sha': sha, 'tree': tree, 'truncated': False}
+
+
+def make_handler(root, quiet=False):
+    class StandInHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = urllib.parse.unquote(urllib.parse.urlsplit(self.path).path)
+            trees = TREES_RE.match(path)
+            if trees:
+                listing = tree_listing(root, trees.group(1))
+                body = None if listing is None else json.dumps(listing).encode('utf-8')
+                self._respond(body, None, content_type(None))
+                return
+
+            file_path = resolve(root, path)
+            if file_path is None or not os.path.isfile(file_path):
+                self._respond(None, None)
+                return
+            with open(file_path, 'rb') as f:
+                body = f.read()
+            self._respond(body, os.path.getmtime(file_path), content_type(file_path))
+
+        def _respond(self, body, mtime, body_type=None):
+            if body is None:
+                self.send_response(404)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+
+            etag = f'"{hashlib.sha1(body).hexdigest()}"'
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+
+            self.send_response(200)
+            self.send_header('Content-Type', body_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('ETag', etag)
+            if mtime is not None:
+                self.send_header('Last-Modified', email.utils.formatdate(mtime, usegmt=True))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            if not quiet:
+                super().log_message(format, *args)
+
+    return StandInHandler
+
+
+def serve(catalog, host=DEFAULT_HOST, port=DEFAULT_PORT, quiet=False):
+    """Serve the checkout until interrupted"""
+    server = ThreadingHTTPServer((host, port), make_handler(catalog.root, quiet))
+    print(f"Serving {catalog.root} at http://{host}:{server.server_port}/ (Ctrl+C to stop)...")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+def add_arguments(parser):
+    parser.add_argument('--host', default=DEFAULT_HOST, help=f'address to bind (default: {DEFAULT_HOST})')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'port to bind (default: {DEFAULT_PORT})')
+    parser.add_argument('--quiet', action='store_true', help='do not log requests')
+
+
+def run(args, catalog):
+    if catalog.rev is not None:
+        print("Error: serve reads files from the checkout and cannot run against --rev")
+        return 2
+    return serve(catalog, args.host, args.port, args.quiet)
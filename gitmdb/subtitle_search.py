@@ -0,0 +1,261 @@
+"""
+`gitmdb search` - full-text phrase search over the stored subtitle cues.
+
+Every language gets its own inverted index under api/search/subtitles/{lang}/:
+
+    manifest.json          indexed cue stores: doc id, title, episode, digest, shards
+    postings/{shard}.json  {term: {doc id: [[chunk, cue, start ms, position, ...], ...]}}
+
+Terms are spread over shard files by the first hex digits of sha1(term), so a
+query only reads the shards of its own terms. The manifest keeps the digest
+of each cue store's index.json; `build-indexes subtitle-search` re-indexes the
+stores whose digest changed and drops the ones that disappeared, touching only
+the shards that held or gain their postings.
+"""
+
+import hashlib
+import json
+import re
+import unicodedata
+
+from gitmdb.catalog import TV_SERIES
+from gitmdb.subtitles import cues_parts, format_timestamp, iter_cue_stores
+
+SEARCH_ROOT = ('api', 'search', 'subtitles')
+MANIFEST_FILE = 'manifest.json'
+SEARCH_VERSION = 1
+SHARD_WIDTH = 2
+DEFAULT_LIMIT = 20
+
+# Cue stores indexed before their postings are merged into the shard files
+FLUSH_DOCS = 200
+
+WORD_RE = re.compile(r'\w+')
+
+
+def tokenize(text):
+    """Case- and accent-folded words of a text"""
+    text = unicodedata.normalize('NFKD', text.casefold())
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return WORD_RE.findall(text)
+
+
+def term_shard(term):
+    return hashlib.sha1(term.encode('utf-8')).hexdigest()[:SHARD_WIDTH]
+
+
+def doc_key(kind, slug, season=None, episode=None):
+    """Stable manifest key of a cue store, independent of the folder layout"""
+    if kind == TV_SERIES:
+        return f'{kind}/{slug}/{season}/{episode}'
+    return f'{kind}/{slug}'
+
+
+def index_cues(catalog, store_parts):
+    """Postings of one cue store: {term: [[chunk, cue, start, position, ...], ...]}"""
+    postings = {}
+    for chunk in catalog.read_json(*store_parts, 'index.json')['chunks']:
+        for number, (start, _, text) in enumerate(catalog.read_json(*store_parts, f'{chunk}.json')['cues']):
+            positions = {}
+            for position, term in enumerate(tokenize(text)):
+                positions.setdefault(term, []).append(position)
+            for term, term_positions in positions.items():
+                postings.setdefault(term, []).append([chunk, number, start] + term_positions)
+    return postings
+
+
+def _empty_manifest():
+    return {'version': SEARCH_VERSION, 'next_id': 0, 'docs': {}}
+
+
+def _load_manifest(catalog, lang):
+    manifest_parts = SEARCH_ROOT + (lang, MANIFEST_FILE)
+    if catalog.exists(*manifest_parts):
+        try:
+            manifest = catalog.read_json(*manifest_parts)
+            if manifest.get('version') == SEARCH_VERSION:
+                return manifest
+        except json.JSONDecodeError:
+            print(f"Warning: Could not decode JSON from {catalog.path(*manifest_parts)}, rebuilding it")
+    return _empty_manifest()
+
+
+def _merge_postings(catalog, lang, stale_ids, shard_postings):
+    """Drop the postings of stale_ids from their shards and add the new ones, return the files written"""
+    written = 0
+    for shard, additions in sorted(shard_postings.items()):
+        shard_parts = SEARCH_ROOT + (lang, 'postings', f'{shard}.json')
+        terms = catalog.read_json(*shard_parts) if catalog.output_exists(*shard_parts) else {}
+        before = json.dumps(terms, sort_keys=True)
+
+        for term in list(terms):
+            docs = terms[term]
+            for doc_id in stale_ids & docs.keys():
+                del docs[doc_id]
+            if not docs:
+                del terms[term]
+        for term, docs in additions.items():
+            terms.setdefault(term, {}).update(docs)
+
+        if json.dumps(terms, sort_keys=True) != before:
+            catalog.write_json(terms, *shard_parts)
+            written += 1
+    return written
+
+
+def update_language_index(catalog, lang, stores):
+    """Bring the index of one language up to date with its cue stores, return the files written"""
+    # Without an earlier index in the output folder (e.g. with --rev --out) everything is indexed again
+    output = catalog.output_exists(*SEARCH_ROOT, lang, MANIFEST_FILE)
+    manifest = _load_manifest(catalog, lang) if output else _empty_manifest()
+    docs = manifest['docs']
+
+    current = {}
+    for kind, slug, season, episode, store_parts in stores:
+        key = doc_key(kind, slug, season, episode)
+        digest = catalog.read_json(*store_parts, 'index.json').get('digest')
+        current[key] = (kind, slug, season, episode, store_parts, digest)
+
+    changed = [key for key, store in sorted(current.items())
+               if key not in docs or docs[key]['digest'] != store[5] or store[5] is None]
+    removed = [key for key in sorted(docs) if key not in current]
+    if not changed and not removed:
+        return 0
+
+    written = 0
+    # Stale postings are dropped in the same pass that adds the first batch
+    stale_ids = set()
+    stale_shards = set()
+    for key in removed + [key for key in changed if key in docs]:
+        doc = docs.pop(key)
+        stale_ids.add(str(doc['id']))
+        stale_shards.update(doc['shards'])
+
+    for offset in range(0, max(len(changed), 1), FLUSH_DOCS):
+        shard_postings = {shard: {} for shard in stale_shards}
+        for key in changed[offset:offset + FLUSH_DOCS]:
+            kind, slug, season, episode, store_parts, digest = current[key]
+            doc_id = manifest['next_id']
+            manifest['next_id'] += 1
+
+            shards = set()
+            for term, entries in index_cues(catalog, store_parts).items():
+                shard = term_shard(term)
+                shard_postings.setdefault(shard, {}).setdefault(term, {})[str(doc_id)] = entries
+                shards.add(shard)
+            docs[key] = {
+                'id': doc_id,
+                'kind': kind,
+                'slug': slug,
+                'season': season,
+                'episode': episode,
+                'digest': digest,
+                'shards': sorted(shards),
+            }
+
+        written += _merge_postings(catalog, lang, stale_ids, shard_postings)
+        stale_ids = set()
+        stale_shards = set()
+        catalog.clear_cache()
+
+    catalog.write_json(manifest, *SEARCH_ROOT, lang, MANIFEST_FILE)
+    return written + 1
+
+
+def build_subtitle_search_index(catalog):
+    """Update the search index of every subtitle language, return the number of files written"""
+    stores_by_lang = {}
+    for kind, slug, season, episode, lang, store_parts in iter_cue_stores(catalog):
+        stores_by_lang.setdefault(lang, []).append((kind, slug, season, episode, store_parts))
+    for lang in catalog.subdirs(*SEARCH_ROOT):
+        stores_by_lang.setdefault(lang, [])
+
+    written = 0
+    for lang, stores in sorted(stores_by_lang.items()):
+        written += update_language_index(catalog, lang, stores)
+    return written
+
+
+class SubtitleSearch:
+    """Phrase queries over the index of one language, reading only the shards of the query terms"""
+
+    def __init__(self, catalog, lang):
+        self.catalog = catalog
+        self.lang = lang
+        self.docs = {str(doc['id']): doc for doc in _load_manifest(catalog, lang)['docs'].values()}
+
+    def postings(self, term):
+        shard_parts = SEARCH_ROOT + (self.lang, 'postings', f'{term_shard(term)}.json')
+        if not self.catalog.exists(*shard_parts):
+            return {}
+        return self.catalog.read_json(*shard_parts).get(term, {})
+
+    def phrase(self, text, limit=None):
+        """Cues containing the words of text in order, as (doc, start ms, chunk, cue) sorted by title and time"""
+        terms = tokenize(text)
+        if not terms:
+            return []
+        term_postings = [self.postings(term) for term in terms]
+
+        # Intersect from the rarest term so most documents are never looked at
+        doc_ids = set(min(term_postings, key=len))
+        for postings in term_postings:
+            doc_ids &= postings.keys()
+
+        hits = []
+        for doc_id in doc_ids:
+            cues = None
+            for offset, postings in enumerate(term_postings):
+                positions = {(entry[0], entry[1]): entry for entry in postings[doc_id]}
+                if cues is None:
+                    cues = {cue: (entry[2], set(entry[3:])) for cue, entry in positions.items()}
+                    continue
+                matched = {}
+                for cue, (start, starts) in cues.items():
+                    if cue in positions:
+                        following = {position - offset for position in positions[cue][3:]} & starts
+                        if following:
+                            matched[cue] = (start, following)
+                cues = matched
+                if not cues:
+                    break
+            for (chunk, number), (start, _) in (cues or {}).items():
+                hits.append((self.docs[doc_id], start, chunk, number))
+
+        hits.sort(key=lambda hit: (hit[0]['kind'], hit[0]['slug'], _episode_key(hit[0]), hit[1], hit[3]))
+        return hits[:limit] if limit else hits
+
+    def cue_text(self, doc, chunk, number):
+        # The folder is resolved now, so the index survives `migrate-layout`
+        store_parts = cues_parts(self.catalog, doc['kind'], doc['slug'], doc['season'], doc['episode'], self.lang)
+        return self.catalog.read_json(*store_parts, f'{chunk}.json')['cues'][number][2]
+
+
+def _episode_key(doc):
+    if doc['kind'] != TV_SERIES:
+        return (0, 0)
+    return (int(doc['season']), int(doc['episode']))
+
+
+def add_arguments(parser):
+    parser.add_argument('query', help='words to find, matched as a phrase')
+    parser.add_argument('--lang', default='en', help='ISO 639-1 language code (default: en)')
+    parser.add_argument('--limit', type=int, default=DEFAULT_LIMIT,
+                        help=f'maximum hits printed, 0 for all (default: {DEFAULT_LIMIT})')
+
+
+def run(args, catalog):
+    if not catalog.exists(*SEARCH_ROOT, args.lang, MANIFEST_FILE):
+        print(f"Error: no subtitle search index for '{args.lang}' (run `gitmdb build-indexes subtitle-search`)")
+        return 1
+
+    search = SubtitleSearch(catalog, args.lang)
+    hits = search.phrase(args.query, args.limit)
+    for doc, start, chunk, number in hits:
+        where = doc['slug']
+        if doc['kind'] == TV_SERIES:
+            where += f" S{doc['season']}E{doc['episode']}"
+        text = ' / '.join(search.cue_text(doc, chunk, number).split('\n'))
+        print(f"{where}  {format_timestamp(start)}  {text}")
+    print(f"{len(hits)} hits.")
+    return 0
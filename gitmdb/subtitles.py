@@ -0,0 +1,280 @@
+"""
+`gitmdb subtitles` - time-indexed cue store for subtitle content.
+
+SRT / WebVTT files are normalized into cues (start ms, end ms, text) and
+stored next to the subtitle index, split into fixed time chunks:
+
+    .../subtitles/{lang}/cues/index.json    chunk list, cue count, longest cue, digest
+    .../subtitles/{lang}/cues/{chunk}.json  {"start": ms, "cues": [[start, end, text], ...]}
+
+A cue belongs to the chunk its start falls in, so a player seeking to t only
+needs index.json and the chunk of t (plus the previous one when a long cue
+may still be running).
+"""
+
+import bisect
+import hashlib
+import json
+import os
+import re
+
+from gitmdb.catalog import MOVIES, TV_SERIES
+from gitmdb.changes import record_change
+
+CHUNK_MS = 5 * 60 * 1000
+CUES_VERSION = 1
+CUES_PROVIDER = 'gitmdb'
+
+TIMESTAMP_RE = re.compile(r'(?:(\d+):)?(\d{1,2}):(\d{2})(?:[,.](\d{1,3}))?')
+TIMING_RE = re.compile(r'^\s*(\S+)\s+-->\s+(\S+)')
+TAG_RE = re.compile(r'<[^>]*>|\{\\[^}]*\}')
+
+
+def parse_timestamp(text):
+    """Milliseconds of an SRT / VTT timestamp"""
+    match = TIMESTAMP_RE.fullmatch(text.strip())
+    if not match:
+        raise ValueError(f"Invalid timestamp: {text}")
+    hours, minutes, seconds, millis = match.groups()
+    return ((int(hours or 0) * 60 + int(minutes)) * 60 + int(seconds)) * 1000 + int((millis or '0').ljust(3, '0'))
+
+
+def format_timestamp(ms):
+    """WebVTT timestamp of a millisecond offset"""
+    hours, ms = divmod(ms, 3600000)
+    minutes, ms = divmod(ms, 60000)
+    seconds, ms = divmod(ms, 1000)
+    return f'{hours:02d}:{minutes:02d}:{seconds:02d}.{ms:03d}'
+
+
+def normalize_text(lines):
+    lines = [' '.join(TAG_RE.sub('', line).split()) for line in lines]
+    return '\n'.join(line for line in lines if line)
+
+
+def parse_cues(content):
+    """Parse SRT or WebVTT text into sorted, de-duplicated [start, end, text] cues"""
+    content = content.lstrip('\ufeff').replace('\r\n', '\n').replace('\r', '\n')
+    cues = []
+    for block in re.split(r'\n\s*\n', content):
+        lines = block.split('\n')
+        for i, line in enumerate(lines):
+            timing = TIMING_RE.match(line)
+            if not timing:
+                continue
+            try:
+                start, end = parse_timestamp(timing.group(1)), parse_timestamp(timing.group(2))
+            except ValueError:
+                break
+            text = normalize_text(lines[i + 1:])
+            if text and end > start:
+                cues.append([start, end, text])
+            break
+
+    cues.sort(key=lambda cue: (cue[0], cue[1]))
+    unique = []
+    for cue in cues:
+        if not unique or unique[-1] != cue:
+            unique.append(cue)
+    return unique
+
+
+def cues_parts(catalog, kind, slug, season=None, episode=None, lang='en'):
+    """Path parts of the cue store of a movie or an episode"""
+    parts = catalog.title_parts(kind, slug)
+    if kind == TV_SERIES:
+        parts += ('s', str(season), 'e', str(episode))
+    return parts + ('subtitles', lang, 'cues')
+
+
+def iter_cue_stores(catalog):
+    """Yield (kind, slug, season, episode, lang, store_parts) for every stored cue set"""
+    for slug in catalog.slugs(MOVIES):
+        subtitles_parts = catalog.title_parts(MOVIES, slug) + ('subtitles',)
+        for lang in catalog.subdirs(*subtitles_parts):
+            if catalog.exists(*subtitles_parts, lang, 'cues', 'index.json'):
+                yield MOVIES, slug, None, None, lang, subtitles_parts + (lang, 'cues')
+
+    for slug in catalog.slugs(TV_SERIES):
+        seasons_parts = catalog.title_parts(TV_SERIES, slug) + ('s',)
+        for season in catalog.subdirs(*seasons_parts):
+            episodes_parts = seasons_parts + (season, 'e')
+            for episode in catalog.subdirs(*episodes_parts):
+                subtitles_parts = episodes_parts + (episode, 'subtitles')
+                for lang in catalog.subdirs(*subtitles_parts):
+                    if catalog.exists(*subtitles_parts, lang, 'cues', 'index.json'):
+                        yield TV_SERIES, slug, season, episode, lang, subtitles_parts + (lang, 'cues')
+
+
+def write_cue_store(catalog, store_parts, cues):
+    """Write cues as chunk files plus index.json, removing chunks that are no longer used"""
+    chunks = {}
+    for cue in cues:
+        chunks.setdefault(cue[0] // CHUNK_MS, []).append(cue)
+
+    for number, chunk_cues in chunks.items():
+        catalog.write_json({'start': number * CHUNK_MS, 'cues': chunk_cues}, *store_parts, f'{number}.json')
+
+    for filename in catalog.listdir(*store_parts):
+        stem = filename[:-len('.json')]
+        if filename.endswith('.json') and stem.isdigit() and int(stem) not in chunks:
+            catalog.remove(*store_parts, filename)
+
+    index = {
+        'version': CUES_VERSION,
+        'chunk_ms': CHUNK_MS,
+        'chunks': sorted(chunks),
+        'count': len(cues),
+        'duration': max((cue[1] for cue in cues), default=0),
+        'max_cue_ms': max((cue[1] - cue[0] for cue in cues), default=0),
+        'digest': hashlib.sha1(json.dumps(cues, ensure_ascii=False).encode('utf-8')).hexdigest(),
+    }
+    catalog.write_json(index, *store_parts, 'index.json')
+    return index
+
+
+def register_cue_store(catalog, store_parts, name, index):
+    """Add or refresh the cue store entry of the subtitle index.json next to it"""
+    index_parts = store_parts[:-1] + ('index.json',)
+    entries = []
+    if catalog.exists(*index_parts):
+        # One cue store per language folder; entries written with a repository path are replaced too
+        entries = [entry for entry in catalog.read_json(*index_parts)
+                   if not (isinstance(entry, dict) and entry.get('provider') == CUES_PROVIDER)]
+    entries.append({
+        'provider': CUES_PROVIDER,
+        'name': name,
+        # Relative to the subtitle folder, so it survives migrate-layout
+        'url': f'{store_parts[-1]}/index.json',
+        'page': None,
+        'meta': {'format': 'cues', 'count': index['count'], 'duration': index['duration']},
+    })
+    catalog.write_json(entries, *index_parts)
+
+
+def ingest_subtitle_file(catalog, path, kind, slug, season=None, episode=None, lang='en'):
+    """Store the cues of an SRT / VTT file for a movie or an episode, return the cue count"""
+    with open(path, 'r', encoding='utf-8-sig', errors='replace') as f:
+        cues = parse_cues(f.read())
+
+    store_parts = cues_parts(catalog, kind, slug, season, episode, lang)
+    index = write_cue_store(catalog, store_parts, cues)
+    register_cue_store(catalog, store_parts, os.path.basename(path), index)
+    record_change(catalog, kind, slug, season, episode)
+    return len(cues)
+
+
+class CueStore:
+    """Window queries over a stored cue set, loading only the chunks they touch"""
+
+    def __init__(self, catalog, store_parts):
+        self.catalog = catalog
+        self.store_parts = store_parts
+        self.index = catalog.read_json(*store_parts, 'index.json')
+        self.available = set(self.index['chunks'])
+        self._chunks = {}
+
+    def _chunk(self, number):
+        if number not in self._chunks:
+            cues = self.catalog.read_json(*self.store_parts, f'{number}.json')['cues']
+            self._chunks[number] = ([cue[0] for cue in cues], cues)
+        return self._chunks[number]
+
+    def window(self, start_ms, end_ms):
+        """Cues shown at any time between start_ms and end_ms, in start order"""
+        chunk_ms = self.index['chunk_ms']
+        earliest_start = max(start_ms - self.index['max_cue_ms'], 0)
+        result = []
+        for number in range(earliest_start // chunk_ms, end_ms // chunk_ms + 1):
+            if number not in self.available:
+                continue
+            starts, cues = self._chunk(number)
+            lo = bisect.bisect_left(starts, earliest_start)
+            hi = bisect.bisect_right(starts, end_ms)
+            result.extend(cue for cue in cues[lo:hi] if cue[1] > start_ms)
+        return result
+
+    def at(self, ms):
+        """Cues on screen at ms"""
+        return self.window(ms, ms)
+
+    def all(self):
+        return [cue for number in sorted(self.available) for cue in self._chunk(number)[1]]
+
+
+def to_vtt(cues):
+    """Render cues as a WebVTT document"""
+    blocks = ['WEBVTT']
+    for start, end, text in cues:
+        blocks.append(f'{format_timestamp(start)} --> {format_timestamp(end)}\n{text}')
+    return '\n\n'.join(blocks) + '\n'
+
+
+def _title_arguments(parser):
+    parser.add_argument('kind', choices=(MOVIES, TV_SERIES))
+    parser.add_argument('slug')
+    parser.add_argument('--season', type=int, help='season number (tv-series)')
+    parser.add_argument('--episode', type=int, help='episode number (tv-series)')
+    parser.add_argument('--lang', default='en', help='ISO 639-1 language code (default: en)')
+
+
+def add_arguments(parser):
+    actions = parser.add_subparsers(dest='action', required=True)
+
+    ingest = actions.add_parser('ingest', help='store the cues of an SRT / VTT file')
+    _title_arguments(ingest)
+    ingest.add_argument('file')
+
+    query = actions.add_parser('query', help='print the cues of a time window')
+    _title_arguments(query)
+    query.add_argument('start', help='window start (HH:MM:SS[.mmm])')
+    query.add_argument('end', nargs='?', help='window end (default: start)')
+
+    export = actions.add_parser('export-vtt', help='write the stored cues as WebVTT')
+    _title_arguments(export)
+    export.add_argument('output', help='output .vtt file, - for stdout')
+
+
+def run(args, catalog):
+    if args.kind == TV_SERIES and (args.season is None or args.episode is None):
+        print("Error: --season and --episode are required for tv-series")
+        return 2
+    store_parts = cues_parts(catalog, args.kind, args.slug, args.season, args.episode, args.lang)
+
+    if args.action == 'ingest':
+        if not catalog.exists(*catalog.title_parts(args.kind, args.slug)):
+            print(f"Error: {args.kind} '{args.slug}' not found")
+            return 1
+        if args.kind == TV_SERIES and not catalog.exists(*store_parts[:-3], 'urls.json'):
+            print(f"Error: {args.slug} has no season {args.season} episode {args.episode}")
+            return 1
+        try:
+            count = ingest_subtitle_file(catalog, args.file, args.kind, args.slug, args.season, args.episode, args.lang)
+        except OSError as e:
+            print(f"Error: cannot read {args.file}: {e.strerror or e}")
+            return 1
+        print(f"Stored {count} cues in {'/'.join(store_parts)}.")
+        return 0
+
+    if not catalog.exists(*store_parts, 'index.json'):
+        print(f"Error: no cue store at {'/'.join(store_parts)}")
+        return 1
+    store = CueStore(catalog, store_parts)
+
+    if args.action == 'query':
+        try:
+            start = parse_timestamp(args.start)
+            end = parse_timestamp(args.end) if args.end else start
+        except ValueError as e:
+            print(f"Error: {e}")
+            return 2
+        print(to_vtt(store.window(start, end)), end='')
+        return 0
+
+    content = to_vtt(store.all())
+    if args.output == '-':
+        print(content, end='')
+    else:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(content)
+    return 0
@@ -0,0 +1,372 @@
+"""
+Parse add-tv-series issues and write them into api/tv-series
+"""
+
+import re
+
+from gitmdb.alts import update_alt_mapping
+from gitmdb.catalog import TV_SERIES, Catalog
+from gitmdb.changes import record_change
+from gitmdb.duplicates import resolve_slug
+from gitmdb.utils import merge_urls, slugify
+
+SUBTITLE_LANGUAGES = ('en', 'id')
+
+# One line for a run of episodes: S1E1-E38 https://host/path/ep{n:02}.mp4
+EPISODE_RANGE_RE = re.compile(r'S(\d+)E(\d+)\s*-\s*E?(\d+)\s+(https?://\S+)', re.IGNORECASE)
+# Same inside a `### Season N` section: - E1-E38 https://host/path/s{s:02}e{n:02}.mp4
+SEASON_RANGE_RE = re.compile(r'-\s+E(\d+)\s*-\s*E?(\d+)\s+(https?://\S+)', re.IGNORECASE)
+# {n} is the episode number, {s} the season number; `:0W` zero-pads to W digits
+URL_PLACEHOLDER_RE = re.compile(r'\{([ns])(?::(0\d{1,2}))?\}')
+MAX_RANGE_EPISODES = 500
+
+
+def compile_url_template(template):
+    """Split an episode URL template into literal text and (field, format spec) pairs"""
+    pieces = []
+    last = 0
+    for match in URL_PLACEHOLDER_RE.finditer(template):
+        pieces.append(template[last:match.start()])
+        pieces.append((match.group(1), match.group(2) or ''))
+        last = match.end()
+    pieces.append(template[last:])
+
+    literal = ''.join(piece for piece in pieces if isinstance(piece, str))
+    if '{' in literal or '}' in literal:
+        raise ValueError(f"Unsupported placeholder in URL template {template} (use {{n}}, {{n:02}}, {{s}} or {{s:02}})")
+    if not any(piece[0] == 'n' for piece in pieces if isinstance(piece, tuple)):
+        raise ValueError(f"URL template {template} has no {{n}} episode placeholder")
+    return pieces
+
+
+def expand_episode_range(season, first, last, template):
+    """Validate a templated episode range, then lazily yield (episode, url) for each of its episodes"""
+    if first < 1 or last < first:
+        raise ValueError(f"Invalid episode range S{season}E{first}-E{last}")
+    if last - first + 1 > MAX_RANGE_EPISODES:
+        raise ValueError(f"Episode range S{season}E{first}-E{last} is longer than {MAX_RANGE_EPISODES} episodes")
+    pieces = compile_url_template(template)
+
+    def render(episode):
+        values = {'n': episode, 's': season}
+        return ''.join(piece if isinstance(piece, str) else format(values[piece[0]], piece[1]) for piece in pieces)
+
+    return ((episode, render(episode)) for episode in range(first, last + 1))
+
+
+def episode_url_entry(source, url):
+    return {
+        'source': source,
+        'url': url,
+        'quality': '1080p',
+        'language': 'en'
+    }
+
+
+def parse_tv_series_issue(issue_body):
+    """Parse TV series issue body and extract information"""
+    # Check if this is from issue form (contains ### format) or old template
+    if '### Series Title' in issue_body and '### Episode URLs' in issue_body:
+        # Parse simple GitHub Issue Form format
+        return parse_simple_issue_form_tv_series(issue_body)
+    elif '### Series Title' in issue_body or '### Release Year' in issue_body:
+        # Parse GitHub Issue Form format (complex)
+        return parse_issue_form_tv_series(issue_body)
+    else:
+        # Parse old markdown template format
+        return parse_markdown_template_tv_series(issue_body)
+
+
+def parse_issue_form_tv_series(issue_body):
+    """Parse TV series issue from GitHub Issue Form"""
+    data = {}
+    episodes = {}
+
+    # Extract basic information
+    title_match = re.search(r'### Series Title\s*\n\s*(.+)', issue_body, re.IGNORECASE)
+    if title_match:
+        data['title'] = title_match.group(1).strip()
+
+    year_match = re.search(r'### Release Year\s*\n\s*(\d{4})', issue_body, re.IGNORECASE)
+    if year_match:
+        data['year'] = int(year_match.group(1))
+
+    # Extract source
+    source_match = re.search(r'### Source\s*\n\s*(.+)', issue_body, re.IGNORECASE)
+    source = source_match.group(1).strip() if source_match else 'GitHub Issue Form'
+
+    # Extract IMDB ID
+    imdb_match = re.search(r'### IMDB ID \(Optional\)\s*\n\s*(tt\d+)', issue_body, re.IGNORECASE)
+    if imdb_match:
+        data['imdb_id'] = imdb_match.group(1)
+
+    # Extract cover URL
+    cover_match = re.search(r'### Cover/Poster URL \(Optional\)\s*\n\s*(https?://\S+)', issue_body, re.IGNORECASE)
+    if cover_match:
+        data['cover'] = cover_match.group(1)
+
+    # Extract summary
+    summary_match = re.search(r'### Summary \(Optional\)\s*\n\s*(.*?)(?=\n### |$)', issue_body, re.IGNORECASE | re.DOTALL)
+    if summary_match:
+        summary = summary_match.group(1).strip()
+        if summary and summary != '_No response_':
+            data['summary'] = summary
+
+    # Extract series status
+    status_match = re.search(r'### Series Status \(Optional\)\s*\n\s*(.+)', issue_body, re.IGNORECASE)
+    if status_match:
+        status = status_match.group(1).strip()
+        if status and status != '_No response_':
+            data['status'] = status.lower()
+
+    # Parse episodes data
+    episodes_match = re.search(r'### Episodes URLs\s*\n\s*(.*?)(?=\n### |$)', issue_body, re.IGNORECASE | re.DOTALL)
+    if episodes_match:
+        episodes_text = episodes_match.group(1).strip()
+        if episodes_text and episodes_text != '_No response_':
+            episodes = parse_episodes_format(episodes_text, source)
+
+    return data, episodes
+
+
+def parse_simple_issue_form_tv_series(issue_body):
+    """Parse TV series issue from simple GitHub Issue Form"""
+    data = {}
+    episodes = {}
+
+    # Extract title
+    title_match = re.search(r'### Series Title\s*\n\s*(.+)', issue_body, re.IGNORECASE)
+    if title_match:
+        data['title'] = title_match.group(1).strip()
+
+    # Extract year
+    year_match = re.search(r'### Release Year\s*\n\s*(\d{4})', issue_body, re.IGNORECASE)
+    if year_match:
+        data['year'] = int(year_match.group(1))
+
+    # Extract source
+    source_match = re.search(r'### Source\s*\n\s*(.+)', issue_body, re.IGNORECASE)
+    source = source_match.group(1).strip() if source_match else 'GitHub Issue Simple'
+
+    # Extract episode URLs from textarea
+    urls_match = re.search(r'### Episode URLs\s*\n\s*(.*?)(?=\n### |$)', issue_body, re.IGNORECASE | re.DOTALL)
+    if urls_match:
+        urls_text = urls_match.group(1).strip()
+        if urls_text and urls_text != '_No response_':
+            # Parse format: S1E1 https://url or just https://url
+            lines = urls_text.split('\n')
+            episode_num = 1
+            for line in lines:
+                line = line.strip()
+                range_match = EPISODE_RANGE_RE.match(line)
+                if range_match:
+                    # Folders are unpadded numbers (s/1/e/1), whatever the issue wrote
+                    season_num = str(int(range_match.group(1)))
+                    season_episodes = episodes.setdefault(season_num, {})
+                    for episode, url in expand_episode_range(int(season_num), int(range_match.group(2)),
+                                                             int(range_match.group(3)), range_match.group(4)):
+                        season_episodes.setdefault(str(episode), []).append(episode_url_entry(source, url))
+                    continue
+
+                if line and ('http' in line):
+                    # Check if line has SxEx format
+                    season_episode_match = re.match(r'S(\d+)E(\d+)\s+(https?://\S+)', line, re.IGNORECASE)
+                    if season_episode_match:
+                        season_num = str(int(season_episode_match.group(1)))
+                        episode_num_parsed = str(int(season_episode_match.group(2)))
+                        url = season_episode_match.group(3)
+                    else:
+                        # Fallback: assume Season 1, sequential episodes
+                        if line.startswith('http'):
+                            season_num = '1'
+                            episode_num_parsed = str(episode_num)
+                            url = line
+                            episode_num += 1
+                        else:
+                            continue
+                    
+                    if season_num not in episodes:
+                        episodes[season_num] = {}
+                    if episode_num_parsed not in episodes[season_num]:
+                        episodes[season_num][episode_num_parsed] = []
+                    
+                    episodes[season_num][episode_num_parsed].append(episode_url_entry(source, url))
+
+    return data, episodes
+
+
+def parse_markdown_template_tv_series(issue_body):
+    """Parse TV series issue from old markdown template format"""
+    data = {}
+    episodes = {}
+
+    # Extract basic information
+    title_match = re.search(r'\*\*Title:\*\*\s*(.+)', issue_body, re.IGNORECASE)
+    if title_match:
+        data['title'] = title_match.group(1).strip()
+
+    year_match = re.search(r'\*\*Year:\*\*\s*(\d{4})', issue_body, re.IGNORECASE)
+    if year_match:
+        data['year'] = int(year_match.group(1))
+
+    # Parse episodes data with simplified format
+    seasons_section = re.search(r'## Episodes Data\s*.*?\n(.*?)(?=---|\Z)', issue_body, re.DOTALL | re.IGNORECASE)
+    if seasons_section:
+        episodes_text = seasons_section.group(1)
+        episodes = parse_episodes_format(episodes_text, 'GitHub Issue')
+
+    return data, episodes
+
+
+def parse_episodes_format(episodes_text, source='GitHub Issue'):
+    """Parse episodes format that works for both form and template"""
+    episodes = {}
+
+    # Find all seasons
+    season_matches = re.finditer(r'### Season (\d+)', episodes_text, re.IGNORECASE)
+
+    for season_match in season_matches:
+        season_num = int(season_match.group(1))
+
+        # Find the end of this season section
+        next_season = re.search(r'### Season \d+', episodes_text[season_match.end():])
+        if next_season:
+            season_text = episodes_text[season_match.end():season_match.end() + next_season.start()]
+        else:
+            season_text = episodes_text[season_match.end():]
+
+        # Find URLs list for this season
+        urls_match = re.search(r'#### Episodes\s*\*\*URLs:\*\*\s*\n((?:- .*\n?)*)', season_text, re.IGNORECASE | re.MULTILINE)
+
+        if urls_match:
+            urls_text = urls_match.group(1)
+            url_lines = urls_text.strip().split('\n')
+
+            season_episodes = {}
+            episode_num = 1
+
+            for line in url_lines:
+                line = line.strip()
+                range_match = SEASON_RANGE_RE.match(line)
+                if range_match:
+                    for episode, url in expand_episode_range(season_num, int(range_match.group(1)),
+                                                             int(range_match.group(2)), range_match.group(3)):
+                        season_episodes.setdefault(episode, []).append(episode_url_entry(source, url))
+                    episode_num = int(range_match.group(2)) + 1
+                    continue
+
+                if line.startswith('- ') and 'http' in line:
+                    # Extract URL from line
+                    url_match = re.search(r'(https?://\S+)', line)
+                    if url_match:
+                        url = url_match.group(1)
+
+                        if episode_num not in season_episodes:
+                            season_episodes[episode_num] = []
+
+                        season_episodes[episode_num].append(episode_url_entry(source, url))
+                        episode_num += 1
+
+            if season_episodes:
+                episodes[season_num] = season_episodes
+
+    return episodes
+
+
+def create_tv_series_structure(data, episodes, issue_number, catalog=None, on_duplicate='merge'):
+    """Create TV series folder structure and files"""
+    if not data.get('title'):
+        raise ValueError("TV series title is required")
+    catalog = catalog or Catalog()
+
+    # Generate slug
+    slug = slugify(data['title'])
+    requested_slug = slug
+    slug = resolve_slug(catalog, TV_SERIES, slug, data['title'], data.get('year'), on_duplicate)
+
+    # Create main series folder
+    series_parts = catalog.title_parts(TV_SERIES, slug)
+    catalog.makedirs(*series_parts)
+
+    # Check if about.json already exists
+    about_parts = series_parts + ('about.json',)
+    previous_about = None
+    if catalog.exists(*about_parts):
+        # Merge new data with existing, keeping existing values if new ones are not provided
+        previous_about = catalog.read_json(*about_parts)
+        about_data = previous_about.copy()
+        for key, value in data.items():
+            if key == 'title' and slug != requested_slug:
+                continue  # Merged into a near-duplicate, keep its title
+            if value:  # Only update if new value is not empty
+                about_data[key] = value
+    else:
+        # Create new about.json for series
+        about_data = {
+            'title': data['title'],
+            'category': data.get('category') or 'TV Series'
+        }
+
+        for key in ('year', 'summary', 'cover', 'imdb_id', 'tmdb_id', 'genre', 'total_seasons', 'status'):
+            if data.get(key):
+                about_data[key] = data[key]
+
+    catalog.write_json(about_data, *about_parts)
+    if about_data != previous_about:
+        # Series title, year or cover appear in every episode entry
+        record_change(catalog, TV_SERIES, slug)
+
+    # Create seasons and episodes structure
+    for season_num, season_episodes in episodes.items():
+        for episode_num, episode_urls in season_episodes.items():
+            episode_parts = series_parts + ('s', str(season_num), 'e', str(episode_num))
+
+            # Handle URLs - merge with existing if file exists
+            urls_parts = episode_parts + ('urls.json',)
+            record_change(catalog, TV_SERIES, slug, season_num, episode_num)
+            if catalog.exists(*urls_parts):
+                existing_urls = catalog.read_json(*urls_parts)
+                added_count = merge_urls(existing_urls, episode_urls)
+                catalog.write_json(existing_urls, *urls_parts)
+
+                if added_count > 0:
+                    print(f"Added {added_count} new URLs to S{season_num}E{episode_num}")
+            else:
+                catalog.write_json(episode_urls, *urls_parts)
+
+                print(f"Created new episode S{season_num}E{episode_num}")
+
+            # Create empty subtitle indexes if they don't exist
+            for lang in SUBTITLE_LANGUAGES:
+                lang_parts = episode_parts + ('subtitles', lang)
+                if not catalog.exists(*lang_parts):
+                    catalog.write_json([], *lang_parts, 'index.json')
+
+    # Create alternative mapping if IMDB ID is provided
+    if data.get('imdb_id'):
+        update_alt_mapping(catalog, TV_SERIES, data['imdb_id'], data['title'], slug)
+
+    return slug
+
+
+def process_tv_series_issue(issue_number, issue_body, catalog=None, on_duplicate='merge'):
+    """Parse an add-tv-series issue and write it, return the exit status"""
+    try:
+        data, episodes = parse_tv_series_issue(issue_body)
+
+        if not data.get('title'):
+            print("Error: TV series title is required")
+            return 1
+
+        if not episodes:
+            print("Error: At least one episode with streaming URL is required")
+            return 1
+
+        create_tv_series_structure(data, episodes, issue_number, catalog, on_duplicate)
+        print(f"Successfully processed TV series issue #{issue_number}: {data['title']}")
+
+    except Exception as e:
+        print(f"Error processing TV series issue: {str(e)}")
+        return 1
+
+    return 0
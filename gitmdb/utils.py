@@ -0,0 +1,72 @@
+"""
+Helpers shared by the ingest, generate and validate commands
+"""
+
+import json
+import re
+
+
+def slugify(text):
+    """Convert text to slug format"""
+    text = text.lower()
+    text = re.sub(r'[^\w\s-]', '', text)
+    text = re.sub(r'[\s_-]+', '-', text)
+    return text.strip('-')
+
+
+def dub_codes(*texts):
+    """Languages marked as dubs by `{lang}-dub` / `dub-{lang}` in slugs or titles"""
+    codes = set()
+    for text in texts:
+        tokens = slugify(text or '').split('-')
+        for i, token in enumerate(tokens):
+            if token in ('dub', 'dubbed'):
+                codes.update(tokens[max(i - 1, 0):i] + tokens[i + 1:i + 2])
+    return codes
+
+
+def numeric_sort_key(name):
+    """Sort key for season/episode folder names"""
+    return int(name) if name.isdigit() else 0
+
+
+def read_json(path):
+    """Load a JSON file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_json(path, data):
+    """Write a JSON file using the repository formatting"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=4, ensure_ascii=False)
+
+
+def collect_urls(urls_data):
+    """Return the non-empty 'url' values of a urls.json list"""
+    urls = []
+    if urls_data and isinstance(urls_data, list):
+        for url_item in urls_data:
+            if url_item and isinstance(url_item, dict) and url_item.get('url'):
+                urls.append(url_item['url'])
+    return urls
+
+
+def merge_urls(existing_urls, new_urls):
+    """Append new URL objects that are not already present, return how many were added"""
+    existing_url_set = {url_obj.get('url') for url_obj in existing_urls if isinstance(url_obj, dict)}
+
+    added_count = 0
+    for new_url in new_urls:
+        if new_url['url'] not in existing_url_set:
+            existing_urls.append(new_url)
+            existing_url_set.add(new_url['url'])
+            added_count += 1
+    return added_count
+
+
+def generate_m3u_entry(title, group_title, urls, logo_url=''):
+    """Render one #EXTINF entry"""
+    attributes = f'tvg-logo="{logo_url}" group-title="{group_title}"'
+    url_lines = '\n'.join(urls)
+    return f'\n#EXTINF:-1 {attributes},{title}\n{url_lines}'
@@ -0,0 +1,132 @@
+"""
+Validation of M3U-Repo content
+"""
+
+import json
+
+from gitmdb.catalog import MOVIES, TV_SERIES
+
+
+def validate_json_file(catalog, *parts):
+    """Validate if a file contains valid JSON"""
+    try:
+        catalog.read_json(*parts)
+        return True, None
+    except json.JSONDecodeError as e:
+        return False, f"Invalid JSON: {str(e)}"
+    except Exception as e:
+        return False, f"Error reading file: {str(e)}"
+
+
+def validate_movie_structure(catalog, slug):
+    """Validate movie folder structure"""
+    errors = []
+    movie_parts = catalog.title_parts(MOVIES, slug)
+    movie_path = catalog.path(*movie_parts)
+
+    # Check required files
+    about_parts = movie_parts + ('about.json',)
+    urls_parts = movie_parts + ('urls.json',)
+
+    if not catalog.exists(*about_parts):
+        errors.append(f"Missing about.json in {movie_path}")
+    else:
+        valid, error = validate_json_file(catalog, *about_parts)
+        if not valid:
+            errors.append(f"Invalid about.json in {movie_path}: {error}")
+        elif 'title' not in catalog.read_json(*about_parts):
+            errors.append(f"Missing 'title' field in {catalog.path(*about_parts)}")
+
+    if not catalog.exists(*urls_parts):
+        errors.append(f"Missing urls.json in {movie_path}")
+    else:
+        valid, error = validate_json_file(catalog, *urls_parts)
+        if not valid:
+            errors.append(f"Invalid urls.json in {movie_path}: {error}")
+        else:
+            # Check if it's a list with valid URLs
+            data = catalog.read_json(*urls_parts)
+            if not isinstance(data, list):
+                errors.append(f"urls.json should be a list in {movie_path}")
+            elif len(data) == 0:
+                errors.append(f"urls.json is empty in {movie_path}")
+
+    return errors
+
+
+def validate_tv_series_structure(catalog, slug):
+    """Validate TV series folder structure"""
+    errors = []
+    series_parts = catalog.title_parts(TV_SERIES, slug)
+    series_path = catalog.path(*series_parts)
+
+    # Check about.json
+    about_parts = series_parts + ('about.json',)
+    if not catalog.exists(*about_parts):
+        errors.append(f"Missing about.json in {series_path}")
+    else:
+        valid, error = validate_json_file(catalog, *about_parts)
+        if not valid:
+            errors.append(f"Invalid about.json in {series_path}: {error}")
+
+    # Check seasons structure
+    seasons_parts = series_parts + ('s',)
+    for season_dir in catalog.subdirs(*seasons_parts):
+        episodes_parts = seasons_parts + (season_dir, 'e')
+        for episode_dir in catalog.subdirs(*episodes_parts):
+            urls_parts = episodes_parts + (episode_dir, 'urls.json')
+            if catalog.exists(*urls_parts):
+                valid, error = validate_json_file(catalog, *urls_parts)
+                if not valid:
+                    errors.append(f"Invalid urls.json in {catalog.path(*urls_parts)}: {error}")
+
+    return errors
+
+
+def _report(label, slug, errors):
+    if errors:
+        print(f"{label} {slug}:")
+        for error in errors:
+            print(f"  - {error}")
+    else:
+        print(f"  ✓ {slug}")
+    return len(errors)
+
+
+def validate_catalog(catalog):
+    """Validate every movie and series, print a report and return the error count"""
+    total_errors = 0
+
+    # Validate movies
+    if catalog.isdir('api', MOVIES):
+        print("Validating movies...")
+        for slug in catalog.slugs(MOVIES):
+            total_errors += _report('Movie', slug, validate_movie_structure(catalog, slug))
+
+    # Validate TV series
+    if catalog.isdir('api', TV_SERIES):
+        print("\nValidating TV series...")
+        for slug in catalog.slugs(TV_SERIES):
+            total_errors += _report('TV Series', slug, validate_tv_series_structure(catalog, slug))
+
+    return total_errors
+
+
+def add_arguments(parser):
+    pass
+
+
+def run(args, catalog):
+    if not catalog.isdir('api'):
+        print("Error: api folder not found")
+        return 1
+
+    total_errors = validate_catalog(catalog)
+
+    # Summary
+    print(f"\nValidation complete. Total errors: {total_errors}")
+
+    if total_errors > 0:
+        return 1
+    print("All content is valid!")
+    return 0
@@ -0,0 +1,354 @@
+"""
+`gitmdb watch` - keep movies.m3u / tv-series.m3u and the playlists of
+playlists.json up to date while api/ is edited.
+
+Changes are picked up with inotify on Linux, or by polling file stamps
+elsewhere, and batched until no new change arrived for the debounce window.
+Each batch only re-reads, revalidates and re-renders the titles it touched;
+everything else stays parsed in the shared Catalog and the rendered entries
+are reused when the playlists are written again. api/playlist-sections.json
+is kept current, so `generate --changed` can splice after a watch session.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import json
+import os
+import select
+import struct
+import sys
+import time
+
+from gitmdb.catalog import KINDS, LAYOUT_FILE, MOVIES, STUB_SLUG, TV_SERIES
+from gitmdb.generate import (ENTRY_ITERATORS, OUTPUT_FILES, PLAYLISTS_FILE, PlaylistWriter, entry_key,
+                             load_playlist_writers, load_sections, render_entry, save_sections)
+from gitmdb.mirrors import load_mirror_results
+from gitmdb.validate import validate_movie_structure, validate_tv_series_structure
+
+DEFAULT_DEBOUNCE = 0.5
+DEFAULT_POLL_INTERVAL = 1.0
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0x00000800
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+              | IN_CREATE | IN_DELETE | IN_DELETE_SELF)
+
+EVENT_HEADER = struct.Struct('iIII')
+
+# Returned by a watcher when it cannot tell what changed
+EVERYTHING = None
+
+
+def _watched_roots(catalog):
+    return [('api', kind) for kind in KINDS if catalog.isdir('api', kind)]
+
+
+class InotifyWatcher:
+    """Recursive inotify watch over api/movies and api/tv-series"""
+
+    def __init__(self, catalog):
+        if not sys.platform.startswith('linux'):
+            raise OSError(errno.ENOSYS, "inotify is only available on Linux")
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.catalog = catalog
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.watches = {}
+        for parts in _watched_roots(catalog):
+            self._add_tree(parts)
+
+    def _add_tree(self, parts):
+        """Watch a folder and its subfolders, return the paths of everything found in them"""
+        found = set()
+        for dirpath, _, filenames in os.walk(self.catalog.path(*parts)):
+            rel_parts = tuple(os.path.relpath(dirpath, self.catalog.root).split(os.sep))
+            wd = self.libc.inotify_add_watch(self.fd, dirpath.encode(), WATCH_MASK)
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {dirpath}")
+            self.watches[wd] = rel_parts
+            found.add(rel_parts)
+            found.update(rel_parts + (filename,) for filename in filenames)
+        return found
+
+    def wait(self, timeout):
+        """Changed paths (as parts tuples) seen within timeout seconds"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+
+        changed = set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, name_size = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + name_size].rstrip(b'\0').decode('utf-8', 'replace')
+            offset += name_size
+
+            if mask & IN_Q_OVERFLOW:
+                return EVERYTHING
+            if mask & IN_IGNORED:
+                self.watches.pop(wd, None)
+                continue
+            parent = self.watches.get(wd)
+            if parent is None:
+                continue
+
+            parts = parent + (name,) if name else parent
+            changed.add(parts)
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                # Anything created inside the new folder before its watch existed sent
+                # no event, e.g. the title folder inside a new shard folder
+                changed |= self._add_tree(parts)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Fallback watcher comparing file stamps every interval seconds"""
+
+    def __init__(self, catalog, interval=DEFAULT_POLL_INTERVAL):
+        self.catalog = catalog
+        self.interval = interval
+        self.stamps = self._scan()
+
+    def _scan(self):
+        stamps = {}
+        for parts in _watched_roots(self.catalog):
+            for dirpath, _, filenames in os.walk(self.catalog.path(*parts)):
+                rel_dir = tuple(os.path.relpath(dirpath, self.catalog.root).split(os.sep))
+                for filename in filenames:
+                    try:
+                        stat = os.stat(os.path.join(dirpath, filename))
+                    except FileNotFoundError:
+                        continue
+                    stamps[rel_dir + (filename,)] = (stat.st_mtime_ns, stat.st_size)
+        return stamps
+
+    def wait(self, timeout):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            stamps = self._scan()
+            changed = {parts for parts in stamps.keys() | self.stamps.keys()
+                       if stamps.get(parts) != self.stamps.get(parts)}
+            self.stamps = stamps
+            if changed:
+                return changed
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return set()
+            time.sleep(self.interval if remaining is None else min(self.interval, remaining))
+
+    def close(self):
+        pass
+
+
+def open_watcher(catalog, force_polling=False, interval=DEFAULT_POLL_INTERVAL):
+    """inotify watcher when available, polling watcher otherwise"""
+    if not force_polling:
+        try:
+            return InotifyWatcher(catalog)
+        except (OSError, AttributeError) as e:
+            print(f"Warning: inotify unavailable ({e}), polling every {interval}s")
+    return PollingWatcher(catalog, interval)
+
+
+def wait_for_batch(watcher, debounce):
+    """Block until something changes, then gather changes until debounce seconds pass quietly"""
+    changed = watcher.wait(None)
+    while True:
+        more = watcher.wait(debounce)
+        if not more and more is not EVERYTHING:
+            return changed
+        if changed is EVERYTHING or more is EVERYTHING:
+            changed = EVERYTHING
+        else:
+            changed |= more
+
+
+def affected_titles(catalog, changed):
+    """Map changed paths to the {kind: set(slugs)} they belong to, or EVERYTHING"""
+    if changed is EVERYTHING:
+        return EVERYTHING
+
+    titles = {kind: set() for kind in KINDS}
+    for parts in changed:
+        if len(parts) < 3 or parts[0] != 'api' or parts[1] not in titles:
+            continue
+        kind = parts[1]
+        if parts[2] == LAYOUT_FILE:
+            return EVERYTHING
+
+        sharded = catalog.layout(kind).get('layout') == 'sharded'
+        slug_index = 3 if sharded and parts[2] != STUB_SLUG else 2
+        if len(parts) > slug_index and parts[slug_index] != STUB_SLUG:
+            titles[kind].add(parts[slug_index])
+    return titles
+
+
+VALIDATORS = {
+    MOVIES: validate_movie_structure,
+    TV_SERIES: validate_tv_series_structure,
+}
+
+
+class WatchSession:
+    """Warm catalog plus the rendered playlist entries of every title"""
+
+    def __init__(self, catalog, rank_mirrors=True):
+        self.catalog = catalog
+        self.rank_mirrors = rank_mirrors
+        self.rendered = {}
+        self.writers = []
+        self.reload()
+
+    def reload(self):
+        """Parse and render the whole catalog"""
+        self.catalog.clear_cache()
+        self.mirror_results = load_mirror_results(self.catalog) if self.rank_mirrors else None
+        self.writers = [PlaylistWriter(OUTPUT_FILES[kind], [kind]) for kind in KINDS]
+        try:
+            self.writers += load_playlist_writers(self.catalog)
+        except (OSError, json.JSONDecodeError, ValueError) as e:
+            print(f"Warning: could not load {PLAYLISTS_FILE}, only writing the main playlists: {e}")
+
+        self.rendered = {kind: {} for kind in KINDS}
+        for kind in KINDS:
+            self._render(kind, self.catalog.slugs(kind))
+        self.write_playlists(KINDS)
+
+    def _render(self, kind, slugs):
+        """Render the entries of slugs once, noting the playlists that accept each of them"""
+        for slug in slugs:
+            self.rendered[kind].pop(slug, None)
+        kind_writers = [writer for writer in self.writers if kind in writer.kinds]
+        for entry in ENTRY_ITERATORS[kind](self.catalog, slugs):
+            outputs = {writer.output for writer in kind_writers if writer.accepts(self.catalog, kind, entry)}
+            if outputs:
+                self.rendered[kind].setdefault(entry['slug'], []).append(
+                    (entry_key(kind, entry), render_entry(entry, self.mirror_results), outputs))
+
+    def write_playlists(self, kinds):
+        """Rewrite the playlists holding entries of kinds from the rendered entries, return those that changed"""
+        changed = []
+        records = {}
+        for writer in self.writers:
+            if not set(writer.kinds) & set(kinds):
+                continue
+            writer.open(self.catalog, in_memory=True)
+            try:
+                for kind in KINDS:
+                    rendered = self.rendered[kind] if kind in writer.kinds else {}
+                    for slug in sorted(rendered):
+                        for key, text, outputs in rendered[slug]:
+                            if writer.output in outputs:
+                                writer.write(text, key)
+            finally:
+                records[writer.output] = writer.close()
+
+            output_path = self.catalog.path(writer.output)
+            try:
+                with open(output_path, 'r', encoding='utf-8') as f:
+                    if f.read() == writer.content:
+                        continue
+            except FileNotFoundError:
+                pass
+            with self.catalog.open_output(*writer.output.split('/')) as f:
+                f.write(writer.content)
+            changed.append(writer.output)
+
+        sections = load_sections(self.catalog)
+        records = {output: record for output, record in records.items() if sections.get(output) != record}
+        if records:
+            save_sections(self.catalog, records)
+        return changed
+
+    def refresh(self, titles):
+        """Revalidate and re-render the given titles, return the number of validation errors"""
+        if titles is EVERYTHING:
+            print("Reloading the whole catalog...")
+            self.reload()
+            return 0
+
+        total_errors = 0
+        kinds = [kind for kind, slugs in titles.items() if slugs]
+        for kind in kinds:
+            slugs = titles[kind]
+            for slug in slugs:
+                self.catalog.invalidate(*self.catalog.title_parts(kind, slug))
+            existing = set(self.catalog.slugs(kind))
+            live_slugs = sorted(slug for slug in slugs if slug in existing)
+
+            validator = VALIDATORS[kind]
+            for slug in live_slugs:
+                errors = validator(self.catalog, slug)
+                if errors:
+                    print(f"{slug}:")
+                    for error in errors:
+                        print(f"  - {error}")
+                total_errors += len(errors)
+
+            for slug in slugs - existing:
+                self.rendered[kind].pop(slug, None)
+            self._render(kind, live_slugs)
+
+        if kinds:
+            slugs = ', '.join(sorted(slug for kind in kinds for slug in titles[kind]))
+            for output in self.write_playlists(kinds):
+                print(f"{output} updated ({slugs}).")
+        return total_errors
+
+
+def watch(catalog, debounce=DEFAULT_DEBOUNCE, force_polling=False, interval=DEFAULT_POLL_INTERVAL,
+          rank_mirrors=True, max_batches=None):
+    """Regenerate the playlists on every batch of changes, until interrupted"""
+    session = WatchSession(catalog, rank_mirrors)
+    watcher = open_watcher(catalog, force_polling, interval)
+    print(f"Watching {catalog.path('api')} for changes (Ctrl+C to stop)...")
+
+    batches = 0
+    try:
+        while max_batches is None or batches < max_batches:
+            titles = affected_titles(catalog, wait_for_batch(watcher, debounce))
+            session.refresh(titles)
+            batches += 1
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+    return 0
+
+
+def add_arguments(parser):
+    parser.add_argument('--debounce', type=float, default=DEFAULT_DEBOUNCE,
+                        help=f'quiet seconds that end a batch of changes (default: {DEFAULT_DEBOUNCE})')
+    parser.add_argument('--poll', action='store_true', help='poll file stamps instead of using inotify')
+    parser.add_argument('--interval', type=float, default=DEFAULT_POLL_INTERVAL,
+                        help=f'seconds between polls (default: {DEFAULT_POLL_INTERVAL})')
+    parser.add_argument('--no-rank', action='store_true',
+                        help='keep URLs in submission order instead of the mirrors.json ranking')
+
+
+def run(args, catalog):
+    if catalog.rev is not None:
+        print("Error: watch follows edits in the working tree and cannot run against --rev")
+        return 2
+    return watch(catalog, args.debounce, args.poll, args.interval, not args.no_rank)